@@ -23,6 +23,11 @@ from tools.github_pr      import git_push, github_pr
 
 ALL_TOOLS = [git_write, clippy, pytest_runner, git_push, github_pr]
 
+# ---------- crew definition ------------------------------------------------
+# Parsed once at import so warm/pre-initialised runners skip it in main().
+with open(YAML_PATH) as f:
+    _CREW_YAML = yaml.safe_load(f)
+
 # ---------- helper: StructuredTool → callable ------------------------------
 def lift(t):
     @functools.wraps(t.run)
@@ -31,14 +36,19 @@ def lift(t):
     return _wrapper
 
 # ---------- build agents ---------------------------------------------------
+_WRAPPED = {}
+
+def wrapped_tools():
+    """Return {name: CrewAI tool}, decorating each StructuredTool only once."""
+    if not _WRAPPED:
+        _WRAPPED.update((t.name, crew_tool(t.name)(lift(t))) for t in ALL_TOOLS)
+    return _WRAPPED
+
 def mk_agents(role_cfgs):
+    wrapped = wrapped_tools()
     out = {}
     for rc in role_cfgs:
-        want = set(rc.get("tools", []))
-        tools = [
-            crew_tool(t.name)(lift(t))
-            for t in ALL_TOOLS if t.name in want
-        ]
+        tools = [wrapped[n] for n in rc.get("tools", []) if n in wrapped]
         out[rc["name"]] = Agent(
             role      = rc["name"],
             goal      = rc.get("goal", ""),
@@ -64,10 +74,8 @@ def mk_tasks(task_cfgs, agents):
 
 # ---------- main -----------------------------------------------------------
 def main():
-    with open(YAML_PATH) as f:
-        data = yaml.safe_load(f)
-    agents = mk_agents(data["roles"])
-    tasks  = mk_tasks(data["tasks"], agents)
+    agents = mk_agents(_CREW_YAML["roles"])
+    tasks  = mk_tasks(_CREW_YAML["tasks"], agents)
     Crew(agents=list(agents.values()),
          tasks=tasks,
          process=Process.sequential,
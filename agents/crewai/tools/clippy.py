@@ -1,5 +1,5 @@
 # clippy.py
-import subprocess, json, os, pathlib, git
+import subprocess, json, os, pathlib
 from langchain.tools import tool
 
 REPO_DIR = pathlib.Path(__file__).resolve().parents[3]
@@ -7,14 +7,34 @@ REPO_DIR = pathlib.Path(__file__).resolve().parents[3]
 @tool("clippy", return_direct=True)
 def clippy() -> str:
     """Run cargo clippy and return JSON warnings (truncated)."""
-    try:
-        out = subprocess.check_output(
-            ["cargo", "clippy", "--message-format=json"],
-            cwd=REPO_DIR, text=True, stderr=subprocess.STDOUT
-        )
-        msgs = [json.loads(l) for l in out.splitlines() if '"message"' in l]
-        if msgs:
-            return "clippy warnings:\n" + json.dumps(msgs[:10], indent=2)  # first 10
-        return "clippy clean"
-    except subprocess.CalledProcessError as e:
-        return f"clippy failed:\n{e.output[:1000]}"
\ No newline at end of file
+    proc = subprocess.Popen(
+        ["cargo", "clippy", "--message-format=json"],
+        cwd=REPO_DIR, text=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+    )
+    msgs, other = [], []
+    has_error = stopped = False
+    with proc:
+        for line in proc.stdout:  # stream; stop once we have enough
+            if not line.startswith("{"):
+                other.append(line)
+                continue
+            try:
+                obj = json.loads(line)
+            except json.JSONDecodeError:
+                other.append(line)
+                continue
+            if obj.get("reason") == "compiler-message" and obj.get("message"):
+                msgs.append(obj)
+                # "error" or "error: internal compiler error"
+                has_error |= obj["message"].get("level", "").startswith("error")
+                if len(msgs) >= 10:
+                    proc.terminate()
+                    stopped = True
+                    break
+    # a terminated run exits nonzero without having failed
+    if has_error or (proc.returncode and not stopped):
+        details = json.dumps(msgs, indent=2) if msgs else "".join(other)
+        return f"clippy failed:\n{details[:1000]}"
+    if msgs:
+        return "clippy warnings:\n" + json.dumps(msgs, indent=2)  # first 10
+    return "clippy clean"
\ No newline at end of file
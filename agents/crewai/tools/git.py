@@ -1,16 +1,20 @@
 # git.py
 from pathlib import Path
-import git, os
+import functools, git, os
 from langchain.tools import tool
 
 
-REPO = git.Repo(Path(__file__).resolve().parents[3])
+@functools.cache
+def _repo() -> git.Repo:
+    """Open the repo on first use rather than at import time."""
+    return git.Repo(Path(__file__).resolve().parents[3])
 
 @tool("git_write", return_direct=True)
 def git_write(path: str, content: str):
     """Create/overwrite a file and stage it for commit."""
-    full = REPO.working_tree_dir + "/" + path
-    Path(full).parent.mkdir(parents=True, exist_ok=True)
-    Path(full).write_text(content)
-    REPO.git.add(path)
-    return f"Wrote {path} ({len(content)} bytes)"
\ No newline at end of file
+    repo = _repo()
+    full = Path(repo.working_tree_dir) / path
+    full.parent.mkdir(parents=True, exist_ok=True)
+    full.write_text(content)
+    repo.index.add([path])  # writes the index in-process, no `git add` spawn
+    return f"Wrote {path} ({len(content)} bytes)"
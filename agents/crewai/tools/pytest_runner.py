@@ -1,14 +1,18 @@
 # pytest_runner.py
-import subprocess, pathlib, textwrap, json
+import subprocess, importlib.util, pathlib, sys
 from langchain.tools import tool
 
 REPO_DIR = pathlib.Path(__file__).resolve().parents[3]
+# spread test files across cores when pytest-xdist is installed
+XDIST_ARGS = ["-n", "auto", "--dist", "loadfile"] if importlib.util.find_spec("xdist") else []
 
 @tool("pytest_runner", return_direct=True)
 def pytest_runner() -> str:
     """Run pytest and return summary (fail ⇒ raise)."""
+    # a fresh interpreter per run, so edited modules are re-imported; the
+    # same interpreter as this process, so XDIST_ARGS match its plugins
     res = subprocess.run(
-        ["pytest", "-q"],
+        [sys.executable, "-m", "pytest", "-q", *XDIST_ARGS],
         cwd=REPO_DIR,
         text=True,
         capture_output=True
@@ -4,21 +4,36 @@ Implements core asset management functionality with proper Merkle trees and sign
 Uses BLAKE3 for content addressing as specified in the AIFS architecture.
 """
 
+import logging
 import os
 import pathlib
-from typing import Dict, List, Optional, Union, BinaryIO, Any
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple, Union, BinaryIO, Any
 import numpy as np
 
 from .storage import StorageBackend
 from .vector_db import VectorDB
-from .metadata import MetadataStore
-from .merkle import MerkleTree
+from .metadata import MetadataStore, split_parents
+from .merkle import MerkleTree, MerkleNodeCache
 from .crypto import CryptoManager
 from .uri import AIFSUri
-from .asset_kinds_simple import SimpleAssetKindEncoder as AssetKindEncoder, SimpleAssetKindValidator as AssetKindValidator, AssetKind, TensorData, EmbeddingData, ArtifactData
+from .asset_kinds_simple import SimpleAssetKindEncoder as AssetKindEncoder, SimpleAssetKindValidator as AssetKindValidator, TensorData, EmbeddingData, ArtifactData
 from .transaction import TransactionManager, StrongCausalityManager
 from .compression import CompressionService
 
+# Number of snapshots whose Merkle tree structure and proofs are kept in memory
+SNAPSHOT_MERKLE_CACHE_SIZE = 128
+
+# In-memory payload types stored without first copying them into bytes
+_BUFFER_TYPES = (bytes, bytearray, memoryview)
+
+# Initial size of the per-thread tensor encoding buffer, and the largest one kept for reuse
+ENCODE_BUFFER_SIZE = 1 << 20
+MAX_ENCODE_BUFFER_SIZE = 64 << 20
+
 
 class AssetManager:
     """Asset manager for AIFS.
@@ -27,9 +42,18 @@ class AssetManager:
     Uses BLAKE3 for content addressing as specified in the AIFS architecture.
     """
     
+    # Validator for each supported asset kind
+    _VALIDATORS = {
+        "blob": AssetKindValidator.validate_blob,
+        "tensor": AssetKindValidator.validate_tensor,
+        "embed": AssetKindValidator.validate_embedding,
+        "artifact": AssetKindValidator.validate_artifact,
+    }
+    
     def __init__(self, root_dir: Union[str, pathlib.Path], embedding_dim: int = 128,
                  private_key: Optional[bytes] = None, enable_strong_causality: bool = True,
-                 compression_level: int = 1):
+                 compression_level: int = 1, hash_threads: Optional[int] = None,
+                 compression_policy: Optional[Dict[str, int]] = None):
         """Initialize asset manager.
         
         Args:
@@ -38,17 +62,45 @@ class AssetManager:
             private_key: Optional Ed25519 private key for signing snapshots
             enable_strong_causality: Enable strong causality guarantees
             compression_level: zstd compression level (1-22, default 1 as per spec)
+            hash_threads: Threads for BLAKE3 hashing of large assets (None = one per core, 1 = single-threaded)
+            compression_policy: Optional zstd level per asset kind, e.g. {"artifact": 15};
+                                kinds not listed use compression_level
         """
+        self.compression_policy = dict(compression_policy or {})
+        for kind, level in self.compression_policy.items():
+            if not 1 <= level <= 22:
+                raise ValueError(f"Compression level for {kind} must be between 1 and 22")
+        
         self.root_dir = pathlib.Path(root_dir)
         self.root_dir.mkdir(parents=True, exist_ok=True)
         
         # Initialize components
-        self.storage = StorageBackend(self.root_dir / "storage", compression_level=compression_level)
+        self.storage = StorageBackend(self.root_dir / "storage", compression_level=compression_level,
+                                      hash_threads=hash_threads)
         self.vector_db = VectorDB(str(self.root_dir / "vectors"), dimension=embedding_dim)
         self.crypto_manager = CryptoManager(private_key, str(self.root_dir / "keys.db"))
         self.metadata_db = MetadataStore(str(self.root_dir / "metadata.db"), self.crypto_manager)
         self.compression_service = CompressionService(compression_level)
         
+        # Internal Merkle node hashes shared across snapshots
+        self._merkle_cache = MerkleNodeCache()
+        
+        # Per-snapshot Merkle tree structure and proofs, keyed by snapshot ID
+        self._snapshot_merkle: "OrderedDict[str, Tuple[Tuple[str, ...], Dict, Dict]]" = OrderedDict()
+        self._snapshot_merkle_lock = threading.Lock()
+        
+        # Embeddings are indexed in the background; a single worker keeps the
+        # vector index single-writer and applies adds in submission order
+        self._vector_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="aifs-vectors")
+        self._pending_vectors: Set[Future] = set()
+        self._pending_vectors_lock = threading.Lock()
+        # Assets whose background insert failed, with the error; reported by
+        # the next vector_search and cleared once the asset is indexed again
+        self._failed_vectors: Dict[str, BaseException] = {}
+        
+        # Per-thread buffer that put_tensor encodes into
+        self._encode_local = threading.local()
+        
         # Transaction and strong causality management
         self.enable_strong_causality = enable_strong_causality
         if enable_strong_causality:
@@ -58,7 +110,7 @@ class AssetManager:
             self.transaction_manager = None
             self.causality_manager = None
     
-    def put_asset(self, data: bytes, kind: str = "blob", 
+    def put_asset(self, data: Union[bytes, bytearray, memoryview, BinaryIO, pathlib.Path], kind: str = "blob", 
                  embedding: Optional[np.ndarray] = None,
                  metadata: Optional[Dict] = None,
                  parents: Optional[List[Dict]] = None,
@@ -66,7 +118,8 @@ class AssetManager:
         """Store an asset.
         
         Args:
-            data: Asset data
+            data: Asset data (any bytes-like buffer, used without copying), or an
+                  os.PathLike path / binary file object to stream blob data from
             kind: Asset kind (blob, tensor, embed, artifact)
             embedding: Optional embedding vector
             metadata: Optional metadata dictionary
@@ -77,23 +130,42 @@ class AssetManager:
         Returns:
             Asset ID (BLAKE3 hash)
         """
-        # Validate asset kind and data
-        if not self._validate_asset_kind(kind, data):
+        # Reject a mis-shaped embedding before paying for storage
+        if embedding is not None:
+            embedding = self._as_embedding(embedding)
+        
+        # Read the parent fields once; they feed both the dependency and lineage writes
+        parent_ids, transform_names, transform_digests = split_parents(parents)
+        
+        # Besides buffers, only file objects and path objects are accepted; a str
+        # is data of the wrong type, never a path
+        if not isinstance(data, _BUFFER_TYPES) and not (hasattr(data, "read") or isinstance(data, os.PathLike)):
             raise ValueError(f"Invalid {kind} asset data")
         
-        # Store data and get content hash
-        asset_id = self.storage.put(data)
+        # Only blobs are streamed; the other kinds need their full payload to validate
+        if not isinstance(data, _BUFFER_TYPES) and kind != "blob":
+            data = data.read() if hasattr(data, "read") else pathlib.Path(data).read_bytes()
         
-        # Validate that we got a proper BLAKE3 hash
-        if not AIFSUri.is_valid_blake3_hash(asset_id):
-            raise ValueError(f"Storage returned invalid hash: {asset_id}")
+        if isinstance(data, _BUFFER_TYPES):
+            data = self._as_buffer(data)
+            
+            # Validate asset kind and data
+            if not self._validate_asset_kind(kind, data):
+                raise ValueError(f"Invalid {kind} asset data")
+            
+            # Store data and get content hash
+            asset_id = self.storage.put(data, self.compression_policy.get(kind))
+            size = len(data)
+        else:
+            # Stream from disk without materializing the payload
+            asset_id, size = self.storage.put_file(data, self.compression_policy.get(kind))
         
         # Use strong causality if enabled
         if self.enable_strong_causality and self.causality_manager:
             # Store asset with strong causality
             asset_data = {
                 "kind": kind,
-                "size": len(data),
+                "size": size,
                 "metadata": metadata or {}
             }
             
@@ -106,67 +178,220 @@ class AssetManager:
                 # Auto-commit the transaction for immediate visibility
                 success = self.transaction_manager.commit_transaction(transaction_id)
                 if not success:
-                    state = self.transaction_manager.get_transaction_state(transaction_id)
-                    deps_committed = self.transaction_manager.check_dependencies_committed(transaction_id)
-                    raise RuntimeError(f"Failed to commit asset {asset_id} for immediate visibility. State: {state}, Dependencies committed: {deps_committed}")
+                    diagnostics = self.transaction_manager.get_commit_diagnostics(transaction_id)
+                    raise RuntimeError(f"Failed to commit asset {asset_id} for immediate visibility. State: {diagnostics['state']}, Dependencies committed: {diagnostics['dependencies_committed']}")
             else:
                 # Add to existing transaction
                 success = self.transaction_manager.add_asset_to_transaction(transaction_id, asset_id)
                 if not success:
                     raise ValueError(f"Failed to add asset {asset_id} to transaction {transaction_id}")
                 
-                if parents:
-                    for parent in parents:
-                        self.transaction_manager.add_dependency(transaction_id, parent["asset_id"])
+                if parent_ids:
+                    self.transaction_manager.add_dependencies(transaction_id, list(parent_ids))
                 
                 # Store metadata (not visible yet)
-                self.metadata_db.add_asset(asset_id, kind, len(data), metadata)
+                self.metadata_db.add_asset(asset_id, kind, size, metadata)
                 
                 # Add lineage information if parents provided
-                if parents:
-                    for parent in parents:
-                        parent_id = parent["asset_id"]
-                        transform_name = parent.get("transform_name")
-                        transform_digest = parent.get("transform_digest")
-                        
-                        self.metadata_db.add_lineage(
-                            child_id=asset_id,
-                            parent_id=parent_id,
-                            transform_name=transform_name,
-                            transform_digest=transform_digest
-                        )
+                if parent_ids:
+                    self.metadata_db.add_lineage_batch(asset_id, parent_ids, transform_names, transform_digests)
             
             # Store embedding if provided
             if embedding is not None:
-                self.vector_db.add(asset_id, embedding)
+                self._submit_vector_add(self.vector_db.add, asset_id, embedding)
             
             return asset_id
         else:
             # Legacy behavior without strong causality
             # Store metadata
-            self.metadata_db.add_asset(asset_id, kind, len(data), metadata)
+            self.metadata_db.add_asset(asset_id, kind, size, metadata)
             
             # Store embedding if provided
             if embedding is not None:
-                self.vector_db.add(asset_id, embedding)
+                self._submit_vector_add(self.vector_db.add, asset_id, embedding)
             
             # Add lineage information if parents provided
-            if parents:
-                for parent in parents:
-                    parent_id = parent["asset_id"]
-                    transform_name = parent.get("transform_name")
-                    transform_digest = parent.get("transform_digest")
-                    
-                    self.metadata_db.add_lineage(
-                        child_id=asset_id,
-                        parent_id=parent_id,
-                        transform_name=transform_name,
-                        transform_digest=transform_digest
-                    )
+            if parent_ids:
+                self.metadata_db.add_lineage_batch(asset_id, parent_ids, transform_names, transform_digests)
             
             
             return asset_id
     
+    def put_assets_batch(self, items: List[Dict[str, Any]],
+                         transaction_id: Optional[str] = None) -> List[str]:
+        """Store several assets at once.
+        
+        Payloads are hashed concurrently, and all metadata and lineage rows are
+        written in one SQLite transaction. With strong causality enabled the
+        batch is a single transaction committed once, so assets in the batch
+        may list each other as parents.
+        
+        Args:
+            items: Asset dictionaries with a "data" key and optional "kind",
+                   "embedding", "metadata" and "parents" keys (as for put_asset)
+            transaction_id: Optional open transaction to add the batch to; it is
+                            left for the caller to commit
+            
+        Returns:
+            Asset IDs in the same order as items
+        """
+        if not items:
+            return []
+        
+        # Validate everything before writing anything
+        kinds = [item.get("kind", "blob") for item in items]
+        payloads = [self._as_buffer(item["data"]) for item in items]
+        embeddings = []
+        for item, kind, data in zip(items, kinds, payloads):
+            if not self._validate_asset_kind(kind, data):
+                raise ValueError(f"Invalid {kind} asset data")
+            embedding = item.get("embedding")
+            embeddings.append(None if embedding is None else self._as_embedding(embedding))
+        
+        asset_ids = self.storage.put_many(
+            payloads, compression_levels=[self.compression_policy.get(kind) for kind in kinds]
+        )
+        
+        assets = [
+            (asset_id, kind, len(data), item.get("metadata"))
+            for asset_id, kind, data, item in zip(asset_ids, kinds, payloads, items)
+        ]
+        lineage = [
+            edge
+            for asset_id, item in zip(asset_ids, items)
+            for edge in self._lineage_edges(asset_id, item.get("parents") or [])
+        ]
+        
+        if self.enable_strong_causality and self.causality_manager:
+            auto_commit = transaction_id is None
+            if auto_commit:
+                transaction_id = self.transaction_manager.begin_transaction()
+            try:
+                if not self.transaction_manager.add_assets_to_transaction(transaction_id, asset_ids):
+                    raise ValueError(f"Failed to add asset batch to transaction {transaction_id}")
+                if lineage:
+                    self.transaction_manager.add_dependencies(
+                        transaction_id, [parent_id for _, parent_id, _, _ in lineage]
+                    )
+                self.metadata_db.add_assets_bulk(assets, lineage)
+                if auto_commit and not self.transaction_manager.commit_transaction(transaction_id):
+                    raise RuntimeError(f"Failed to commit asset batch in transaction {transaction_id}")
+            except Exception:
+                # Don't leave our own transaction open with the batch reserved;
+                # a caller-supplied transaction is the caller's to roll back
+                if auto_commit:
+                    self.transaction_manager.rollback_transaction(transaction_id)
+                raise
+        else:
+            self.metadata_db.add_assets_bulk(assets, lineage)
+        
+        # Index embeddings once the metadata is in place
+        indexed = [(asset_id, embedding) for asset_id, embedding in zip(asset_ids, embeddings)
+                   if embedding is not None]
+        if indexed:
+            self._submit_vector_add(self.vector_db.add_many, [asset_id for asset_id, _ in indexed],
+                                    np.stack([embedding for _, embedding in indexed]))
+        
+        return asset_ids
+    
+    def _submit_vector_add(self, fn, *args) -> None:
+        """Queue a vector index insert on the background worker.
+        
+        Args:
+            fn: VectorDB method to call
+            *args: Arguments for the call, starting with the asset ID or list
+                   of asset IDs being indexed
+        """
+        asset_ids = [args[0]] if isinstance(args[0], str) else list(args[0])
+        future = self._vector_pool.submit(fn, *args)
+        with self._pending_vectors_lock:
+            self._pending_vectors.add(future)
+        future.add_done_callback(lambda done: self._vector_add_done(done, asset_ids))
+    
+    def _vector_add_done(self, future: Future, asset_ids: List[str]) -> None:
+        """Forget a finished vector index insert, recording any failure.
+        
+        Args:
+            future: Finished insert
+            asset_ids: Asset IDs the insert covered
+        """
+        error = future.exception()
+        with self._pending_vectors_lock:
+            self._pending_vectors.discard(future)
+            for asset_id in asset_ids:
+                if error is None:
+                    self._failed_vectors.pop(asset_id, None)
+                else:
+                    self._failed_vectors[asset_id] = error
+        if error is not None:
+            logging.error(f"Failed to index embedding: {error}")
+    
+    def _flush_vectors(self) -> None:
+        """Wait until all queued vector index inserts have been applied."""
+        with self._pending_vectors_lock:
+            pending = list(self._pending_vectors)
+        if pending:
+            wait(pending)
+    
+    def _raise_vector_failures(self) -> None:
+        """Report background index inserts that failed since the last report.
+        
+        Raises:
+            RuntimeError: If any asset's embedding could not be indexed; storing
+                          the asset again with its embedding re-indexes it
+        """
+        with self._pending_vectors_lock:
+            failed, self._failed_vectors = self._failed_vectors, {}
+        if failed:
+            raise RuntimeError(
+                f"Failed to index embeddings for assets {sorted(failed)}; "
+                f"they are missing from vector search until stored again"
+            ) from next(iter(failed.values()))
+    
+    def _as_embedding(self, embedding: np.ndarray) -> np.ndarray:
+        """Normalize an embedding to a contiguous float32 vector of the index dimension.
+        
+        Args:
+            embedding: Embedding as any array-like of shape (dim,) or (1, dim)
+            
+        Returns:
+            Contiguous float32 array of shape (dim,)
+            
+        Raises:
+            ValueError: If the embedding does not have the index dimension
+        """
+        vector = np.ascontiguousarray(embedding, dtype=np.float32).reshape(-1)
+        if vector.shape != (self.vector_db.dimension,):
+            raise ValueError(
+                f"Embedding must have shape ({self.vector_db.dimension},), got {np.shape(embedding)}"
+            )
+        return vector
+    
+    @staticmethod
+    def _as_buffer(data: Any) -> Any:
+        """Present a memoryview as flat, contiguous bytes so len() is its size in bytes.
+        
+        Args:
+            data: Asset payload
+            
+        Returns:
+            The payload, with memoryviews of other shapes or formats cast to bytes
+        """
+        if isinstance(data, memoryview):
+            if not data.c_contiguous:
+                return data.tobytes()
+            if data.ndim != 1 or data.format != "B":
+                return data.cast("B")
+        return data
+    
+    @staticmethod
+    def _lineage_edges(child_id: str, parents: List[Dict]) -> List[Tuple]:
+        """Build (child_id, parent_id, transform_name, transform_digest) rows for bulk insert."""
+        return [
+            (child_id, parent["asset_id"], parent.get("transform_name"), parent.get("transform_digest"))
+            for parent in parents
+        ]
+    
     def begin_transaction(self, metadata: Optional[Dict[str, Any]] = None) -> str:
         """Begin a new transaction for atomic operations.
         
@@ -309,15 +534,22 @@ class AssetManager:
         Returns:
             Asset ID (BLAKE3 hash)
         """
-        # Encode tensor data
-        encoded_data = AssetKindEncoder.encode_tensor(tensor_data)
-        
         # Merge tensor metadata with provided metadata
         combined_metadata = tensor_data.metadata or {}
         if metadata:
             combined_metadata.update(metadata)
         
-        return self.put_asset(encoded_data, "tensor", embedding, combined_metadata, parents)
+        # Encode into this thread's reusable buffer; put_asset stores the view without copying
+        buffer = getattr(self._encode_local, "buffer", None)
+        if buffer is None:
+            buffer = self._encode_local.buffer = bytearray(ENCODE_BUFFER_SIZE)
+        with AssetKindEncoder.encode_tensor_into(tensor_data, buffer) as encoded_data:
+            asset_id = self.put_asset(encoded_data, "tensor", embedding, combined_metadata, parents)
+        
+        # Don't hold on to the memory of an unusually large tensor
+        if len(buffer) > MAX_ENCODE_BUFFER_SIZE:
+            self._encode_local.buffer = None
+        return asset_id
     
     def put_embedding(self, embedding_data: EmbeddingData,
                      metadata: Optional[Dict] = None,
@@ -335,7 +567,51 @@ class AssetManager:
         # Encode embedding data
         encoded_data = AssetKindEncoder.encode_embedding(embedding_data)
         
-        # Create metadata from embedding data
+        combined_metadata = self._embedding_metadata(embedding_data, metadata)
+        
+        return self.put_asset(encoded_data, "embed", None, combined_metadata, parents)
+    
+    def put_embeddings_bulk(self, embedding_datas: List[EmbeddingData],
+                            metadata: Optional[Dict] = None,
+                            index: bool = False) -> List[str]:
+        """Store several embedding assets in one batch.
+        
+        Args:
+            embedding_datas: EmbeddingData objects to store
+            metadata: Optional metadata dictionary applied to every asset
+            index: Also add the vectors to the similarity index, as one matrix
+                   (they must match the index dimension)
+            
+        Returns:
+            Asset IDs in the same order as embedding_datas
+        """
+        if not embedding_datas:
+            return []
+        
+        matrix = None
+        if index:
+            matrix = np.ascontiguousarray(np.stack([e.vector for e in embedding_datas]), dtype=np.float32)
+            if matrix.shape[1:] != (self.vector_db.dimension,):
+                raise ValueError(
+                    f"Embeddings must have dimension {self.vector_db.dimension}, got {matrix.shape[1:]}"
+                )
+        
+        asset_ids = self.put_assets_batch([
+            {
+                "data": AssetKindEncoder.encode_embedding(embedding_data),
+                "kind": "embed",
+                "metadata": self._embedding_metadata(embedding_data, metadata),
+            }
+            for embedding_data in embedding_datas
+        ])
+        
+        if matrix is not None:
+            self._submit_vector_add(self.vector_db.add_many, asset_ids, matrix)
+        return asset_ids
+    
+    @staticmethod
+    def _embedding_metadata(embedding_data: EmbeddingData, metadata: Optional[Dict]) -> Dict:
+        """Create asset metadata from embedding data, overlaid with caller metadata."""
         combined_metadata = {
             'model': embedding_data.model,
             'dimension': embedding_data.dimension,
@@ -346,8 +622,7 @@ class AssetManager:
         }
         if metadata:
             combined_metadata.update(metadata)
-        
-        return self.put_asset(encoded_data, "embed", None, combined_metadata, parents)
+        return combined_metadata
     
     def put_artifact(self, artifact_data: ArtifactData,
                     metadata: Optional[Dict] = None,
@@ -439,19 +714,9 @@ class AssetManager:
         Returns:
             True if valid, False otherwise
         """
-        try:
-            if kind == "blob":
-                return AssetKindValidator.validate_blob(data)
-            elif kind == "tensor":
-                return AssetKindValidator.validate_tensor(data)
-            elif kind == "embed":
-                return AssetKindValidator.validate_embedding(data)
-            elif kind == "artifact":
-                return AssetKindValidator.validate_artifact(data)
-            else:
-                return False
-        except Exception:
-            return False
+        # The validators report malformed data by returning False, never by raising
+        validator = self._VALIDATORS.get(kind)
+        return False if validator is None else validator(data)
     
     def list_assets(self, limit: int = 100, offset: int = 0) -> List[Dict]:
         """List assets.
@@ -616,18 +881,7 @@ class AssetManager:
         Returns:
             List of visible parent asset metadata dictionaries
         """
-        # Get all parents from metadata
-        all_parents = self.metadata_db.get_parents(asset_id)
-        
-        # Filter to only visible parents if strong causality is enabled
-        if self.enable_strong_causality and self.causality_manager:
-            visible_parents = []
-            for parent in all_parents:
-                if self.transaction_manager.is_asset_visible(parent["asset_id"]):
-                    visible_parents.append(parent)
-            return visible_parents
-        
-        return all_parents
+        return self._visible_lineage(self.metadata_db.get_parents(asset_id))
     
     def get_children(self, asset_id: str) -> List[Dict]:
         """Get child assets (respecting strong causality).
@@ -638,18 +892,27 @@ class AssetManager:
         Returns:
             List of visible child asset metadata dictionaries
         """
-        # Get all children from metadata
-        all_children = self.metadata_db.get_children(asset_id)
+        return self._visible_lineage(self.metadata_db.get_children(asset_id))
+    
+    def _visible_lineage(self, related: List[Dict]) -> List[Dict]:
+        """Filter lineage entries to visible assets if strong causality is enabled.
         
-        # Filter to only visible children if strong causality is enabled
-        if self.enable_strong_causality and self.causality_manager:
-            visible_children = []
-            for child in all_children:
-                if self.transaction_manager.is_asset_visible(child["asset_id"]):
-                    visible_children.append(child)
-            return visible_children
+        Visibility lives in the transaction database, so it is checked with one
+        query for all entries rather than one per entry.
         
-        return all_children
+        Args:
+            related: Parent or child asset dictionaries
+            
+        Returns:
+            The entries whose assets are visible, in their original order
+        """
+        if not related or not (self.enable_strong_causality and self.causality_manager):
+            return related
+        
+        visible = self.transaction_manager.get_visible_assets_subset(
+            list({asset["asset_id"] for asset in related})
+        )
+        return [asset for asset in related if asset["asset_id"] in visible]
     
     def get_asset(self, asset_id: str) -> Optional[Dict]:
         """Retrieve an asset.
@@ -694,28 +957,100 @@ class AssetManager:
             "children": children
         }
     
-    def vector_search(self, query_embedding: np.ndarray, k: int = 10) -> List[Dict]:
+    def vector_search(self, query_embedding: np.ndarray, k: int = 10,
+                      include_data: bool = False) -> List[Dict]:
         """Search for similar assets.
         
         Args:
             query_embedding: Query embedding vector
             k: Number of results to return
+            include_data: Also load each asset's data and lineage (as get_asset does)
             
         Returns:
             List of asset dictionaries with similarity scores
+            
+        Raises:
+            RuntimeError: If embeddings stored since the last search failed to
+                          be indexed (reported once)
         """
-        # Search vector database
-        results = self.vector_db.search(query_embedding, k)
+        # Search vector database once queued embeddings are indexed
+        self._flush_vectors()
+        self._raise_vector_failures()
+        results = self.vector_db.search(self._as_embedding(query_embedding), k)
         
-        # Get full asset metadata for each result
-        assets = []
-        for asset_id, score in results:
-            asset = self.get_asset(asset_id)
-            if asset:
-                asset["score"] = score
-                assets.append(asset)
+        if include_data:
+            return self._hydrate_search_results(results)
         
-        return assets
+        # Metadata only: one query for all hits, plus one visibility check
+        asset_ids = [asset_id for asset_id, _ in results]
+        found = self.metadata_db.get_assets_bulk(asset_ids)
+        if self.enable_strong_causality and self.causality_manager:
+            visible = self.transaction_manager.get_visible_assets_subset(list(found))
+        else:
+            visible = found.keys()
+        
+        return [
+            {**found[asset_id], "score": score}
+            for asset_id, score in results
+            if asset_id in visible and found[asset_id]["kind"] != "deleted"
+        ]
+    
+    def _hydrate_search_results(self, results: List[Tuple[str, float]]) -> List[Dict]:
+        """Load full assets for search hits, as get_asset would, with batched lookups.
+        
+        Args:
+            results: (asset_id, score) pairs from the vector database
+            
+        Returns:
+            List of asset dictionaries with data, lineage and similarity scores
+        """
+        causal = self.enable_strong_causality and self.causality_manager
+        asset_ids = list(dict.fromkeys(asset_id for asset_id, _ in results))
+        if causal:
+            visible = self.transaction_manager.get_visible_assets_subset(asset_ids)
+            asset_ids = [asset_id for asset_id in asset_ids if asset_id in visible]
+        
+        metadata = self.metadata_db.get_assets_bulk(asset_ids)
+        if causal:
+            asset_ids = [asset_id for asset_id in asset_ids if asset_id in metadata]
+        data = self.storage.get_many(asset_ids)
+        asset_ids = [asset_id for asset_id in asset_ids if asset_id in data]
+        
+        parents = self.metadata_db.get_parents_bulk(asset_ids)
+        children = self.metadata_db.get_children_bulk(asset_ids)
+        
+        # Filter lineage to visible assets if strong causality is enabled
+        if causal:
+            related = {
+                asset["asset_id"]
+                for lineage in (parents, children)
+                for assets in lineage.values()
+                for asset in assets
+            }
+            visible = self.transaction_manager.get_visible_assets_subset(list(related))
+            for lineage in (parents, children):
+                for asset_id, assets in lineage.items():
+                    lineage[asset_id] = [asset for asset in assets if asset["asset_id"] in visible]
+        
+        hits = []
+        for asset_id, score in results:
+            if asset_id not in data:
+                continue
+            asset_metadata = metadata.get(asset_id) or {
+                "asset_id": asset_id,
+                "kind": "blob",
+                "size": len(data[asset_id]),
+                "created_at": None,
+                "metadata": {}
+            }
+            hits.append({
+                **asset_metadata,
+                "data": data[asset_id],
+                "parents": list(parents[asset_id]),
+                "children": list(children[asset_id]),
+                "score": score
+            })
+        return hits
     
     def create_snapshot(self, namespace: str, asset_ids: List[str], 
                        metadata: Optional[Dict] = None) -> str:
@@ -729,10 +1064,8 @@ class AssetManager:
         Returns:
             Snapshot ID
         """
-        from datetime import datetime
-        
         # Create Merkle tree from asset IDs
-        merkle_tree = MerkleTree(asset_ids)
+        merkle_tree = MerkleTree(asset_ids, self._merkle_cache)
         merkle_root = merkle_tree.get_root_hash()
         
         # Get current timestamp
@@ -743,15 +1076,13 @@ class AssetManager:
             merkle_root, timestamp, namespace
         )
         
-        # Create snapshot with signature
+        # Create snapshot with signature and its assets in one transaction, storing
+        # the tree so reads need not re-hash it
         snapshot_id = self.metadata_db.create_snapshot(
-            namespace, merkle_root, metadata, signature_hex, timestamp
+            namespace, merkle_root, metadata, signature_hex, timestamp,
+            merkle_tree=merkle_tree.serialize(), asset_ids=asset_ids
         )
         
-        # Add assets to snapshot
-        for asset_id in asset_ids:
-            self.metadata_db.add_asset_to_snapshot(snapshot_id, asset_id)
-        
         return snapshot_id
     
     def get_snapshot(self, snapshot_id: str) -> Optional[Dict]:
@@ -768,20 +1099,80 @@ class AssetManager:
             return None
         
         # Add Merkle tree information
-        asset_ids = [asset["asset_id"] for asset in snapshot["assets"]]
-        merkle_tree = MerkleTree(asset_ids)
-        
-        snapshot["merkle_tree"] = merkle_tree.get_tree_structure()
-        snapshot["merkle_proofs"] = {}
+        asset_ids = tuple(asset["asset_id"] for asset in snapshot["assets"])
+        tree_structure, proofs = self._snapshot_merkle_info(snapshot_id, asset_ids, snapshot["merkle_root"])
         
-        # Generate proofs for each asset
-        for asset_id in asset_ids:
-            proof = merkle_tree.get_proof(asset_id)
-            if proof:
-                snapshot["merkle_proofs"][asset_id] = proof
+        # Copy so callers cannot mutate the cached entries
+        snapshot["merkle_tree"] = dict(tree_structure)
+        snapshot["merkle_proofs"] = {asset_id: list(proof) for asset_id, proof in proofs.items()}
         
         return snapshot
     
+    def _snapshot_merkle_info(self, snapshot_id: str, asset_ids: Tuple[str, ...],
+                              merkle_root: str) -> Tuple[Dict, Dict]:
+        """Get the Merkle tree structure and proofs for a snapshot, building them once.
+        
+        Entries are reused only while the snapshot's asset list is unchanged.
+        
+        Args:
+            snapshot_id: Snapshot ID
+            asset_ids: IDs of the assets in the snapshot
+            merkle_root: Merkle root recorded for the snapshot
+            
+        Returns:
+            Tuple of (tree structure, proofs by asset ID)
+        """
+        with self._snapshot_merkle_lock:
+            cached = self._snapshot_merkle.get(snapshot_id)
+            if cached is not None and cached[0] == asset_ids:
+                self._snapshot_merkle.move_to_end(snapshot_id)
+                return cached[1], cached[2]
+        
+        merkle_tree = self._stored_merkle_tree(snapshot_id, asset_ids, merkle_root)
+        if merkle_tree is None:
+            merkle_tree = MerkleTree(list(asset_ids), self._merkle_cache)
+        tree_structure = merkle_tree.get_tree_structure()
+        
+        # Generate proofs for all assets in one pass over the tree
+        proofs = {
+            asset_id: proof for asset_id, proof in merkle_tree.get_all_proofs().items() if proof
+        }
+        
+        with self._snapshot_merkle_lock:
+            self._snapshot_merkle[snapshot_id] = (asset_ids, tree_structure, proofs)
+            self._snapshot_merkle.move_to_end(snapshot_id)
+            if len(self._snapshot_merkle) > SNAPSHOT_MERKLE_CACHE_SIZE:
+                self._snapshot_merkle.popitem(last=False)
+        
+        return tree_structure, proofs
+    
+    def _stored_merkle_tree(self, snapshot_id: str, asset_ids: Tuple[str, ...],
+                            merkle_root: str) -> Optional[MerkleTree]:
+        """Load the Merkle tree stored with a snapshot if it still matches it.
+        
+        Args:
+            snapshot_id: Snapshot ID
+            asset_ids: IDs of the assets in the snapshot
+            merkle_root: Merkle root recorded for the snapshot
+            
+        Returns:
+            The stored tree, or None if there is none or it is stale or malformed
+        """
+        data = self.metadata_db.get_snapshot_merkle_tree(snapshot_id)
+        if data is None:
+            return None
+        
+        try:
+            merkle_tree = MerkleTree.deserialize(data, self._merkle_cache)
+        except (ValueError, KeyError, TypeError) as e:
+            logging.warning(f"Ignoring stored Merkle tree for snapshot {snapshot_id}: {e}")
+            return None
+        
+        # Assets added after creation make the stored tree stale
+        if merkle_tree.asset_ids != sorted(asset_ids) or merkle_tree.get_root_hash() != merkle_root:
+            return None
+        return merkle_tree
+    
     def verify_snapshot(self, snapshot_id: str, public_key: bytes = None) -> bool:
         """Verify a snapshot's signature.
         
@@ -825,22 +1216,25 @@ class AssetManager:
             True if deleted successfully, False otherwise
         """
         try:
-            # Check if asset exists
-            asset = self.get_asset(asset_id)
-            if not asset:
+            # Check if asset exists (without loading its data)
+            if not self.metadata_db.asset_exists(asset_id) or not self.storage.exists(asset_id):
+                return False
+            if (self.enable_strong_causality and self.causality_manager
+                    and not self.transaction_manager.is_asset_visible(asset_id)):
                 return False
             
             # Check if asset is referenced by other assets (unless force=True)
             if not force:
-                children = self.metadata_db.get_children(asset_id)
-                if children:
-                    raise ValueError(f"Asset {asset_id} is referenced by {len(children)} other assets. Use force=True to delete anyway.")
+                child_count = self.metadata_db.count_children(asset_id)
+                if child_count:
+                    raise ValueError(f"Asset {asset_id} is referenced by {child_count} other assets. Use force=True to delete anyway.")
             
             # Remove from vector database if it has an embedding
-            try:
-                self.vector_db.remove(asset_id)
-            except:
-                pass  # Ignore if not in vector DB
+            # (returns False when the asset has none)
+            self._flush_vectors()
+            self.vector_db.delete(asset_id)
+            with self._pending_vectors_lock:
+                self._failed_vectors.pop(asset_id, None)
             
             # Remove from storage
             self.storage.delete(asset_id)
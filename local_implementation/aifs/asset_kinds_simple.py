@@ -75,58 +75,102 @@ class SimpleAssetKindEncoder:
     
     @staticmethod
     def encode_tensor(tensor_data: TensorData) -> bytes:
-        """Encode tensor data using simplified format."""
+        """Encode tensor data using simplified format.
+        
+        The sections are joined straight into the result, so the tensor
+        payload is copied exactly once.
+        """
+        sections, _ = SimpleAssetKindEncoder._tensor_sections(tensor_data)
+        return b"".join(
+            part for length, section in sections for part in (struct.pack('I', length), section)
+        )
+    
+    @staticmethod
+    def encode_tensor_into(tensor_data: TensorData, out: bytearray) -> memoryview:
+        """Encode tensor data into a reusable buffer.
+        
+        The buffer is grown if it is too small and is never shrunk; it cannot
+        be resized while the returned view is alive.
+        
+        Args:
+            tensor_data: Tensor to encode
+            out: Buffer to write the encoding into
+            
+        Returns:
+            View of the encoded bytes at the start of ``out``
+        """
+        sections, size = SimpleAssetKindEncoder._tensor_sections(tensor_data)
+        if len(out) < size:
+            out.extend(bytes(size - len(out)))
+        SimpleAssetKindEncoder._pack_sections(sections, out)
+        return memoryview(out)[:size]
+    
+    @staticmethod
+    def _tensor_sections(tensor_data: TensorData):
+        """Split a tensor into its (length prefix, section) pairs and encoded size."""
         # Create a simple binary format for tensors
         # Format: [dtype_len][dtype][shape_len][shape][data_len][data][metadata_len][metadata]
         
         dtype_bytes = tensor_data.dtype.encode('utf-8')
         shape_bytes = struct.pack(f'{len(tensor_data.shape)}q', *tensor_data.shape)
-        data_bytes = tensor_data.data.tobytes()
+        data_view = memoryview(np.ascontiguousarray(tensor_data.data).reshape(-1).view(np.uint8))
         metadata_bytes = json.dumps(tensor_data.metadata or {}).encode('utf-8')
         
-        # Pack the data
-        result = struct.pack('I', len(dtype_bytes))  # dtype length
-        result += dtype_bytes
-        result += struct.pack('I', len(tensor_data.shape))  # shape length
-        result += shape_bytes
-        result += struct.pack('I', len(data_bytes))  # data length
-        result += data_bytes
-        result += struct.pack('I', len(metadata_bytes))  # metadata length
-        result += metadata_bytes
-        
-        return result
+        # The shape is prefixed by its rank rather than its byte length
+        sections = (
+            (len(dtype_bytes), dtype_bytes),
+            (len(tensor_data.shape), shape_bytes),
+            (len(data_view), data_view),
+            (len(metadata_bytes), metadata_bytes),
+        )
+        return sections, sum(4 + len(section) for _, section in sections)
+    
+    @staticmethod
+    def _pack_sections(sections, out: bytearray) -> None:
+        """Write length-prefixed sections to the start of a buffer."""
+        offset = 0
+        for length, section in sections:
+            struct.pack_into('I', out, offset, length)
+            offset += 4
+            out[offset:offset + len(section)] = section
+            offset += len(section)
     
     @staticmethod
     def decode_tensor(data: bytes) -> TensorData:
-        """Decode tensor data from simplified format."""
+        """Decode tensor data from simplified format.
+        
+        Accepts any bytes-like object; the returned array is a view of it.
+        """
         offset = 0
         
         # Read dtype
-        dtype_len = struct.unpack('I', data[offset:offset+4])[0]
+        dtype_len = struct.unpack_from('I', data, offset)[0]
         offset += 4
-        dtype = data[offset:offset+dtype_len].decode('utf-8')
+        dtype = str(data[offset:offset+dtype_len], 'utf-8')
         offset += dtype_len
         
         # Read shape
-        shape_len = struct.unpack('I', data[offset:offset+4])[0]
+        shape_len = struct.unpack_from('I', data, offset)[0]
         offset += 4
-        shape = struct.unpack(f'{shape_len}q', data[offset:offset+shape_len*8])
+        shape = struct.unpack_from(f'{shape_len}q', data, offset)
         offset += shape_len * 8
         
         # Read data
-        data_len = struct.unpack('I', data[offset:offset+4])[0]
+        data_len = struct.unpack_from('I', data, offset)[0]
         offset += 4
-        data_bytes = data[offset:offset+data_len]
+        data_offset = offset
         offset += data_len
         
         # Read metadata
-        metadata_len = struct.unpack('I', data[offset:offset+4])[0]
+        metadata_len = struct.unpack_from('I', data, offset)[0]
         offset += 4
-        metadata_bytes = data[offset:offset+metadata_len]
-        metadata = json.loads(metadata_bytes.decode('utf-8'))
+        metadata = json.loads(str(data[offset:offset+metadata_len], 'utf-8'))
         
-        # Reconstruct numpy array
-        data_array = np.frombuffer(data_bytes, dtype=dtype).reshape(shape)
+        # Reconstruct numpy array without copying the payload
+        dtype_obj = np.dtype(dtype)
+        data_array = np.frombuffer(
+            data, dtype=dtype_obj, count=data_len // dtype_obj.itemsize, offset=data_offset
+        ).reshape(shape)
         
         return TensorData(
             data=data_array,
@@ -174,32 +218,31 @@ class SimpleAssetKindEncoder:
         offset = 0
         
         # Read model
-        model_len = struct.unpack('I', data[offset:offset+4])[0]
+        model_len = struct.unpack_from('I', data, offset)[0]
         offset += 4
-        model = data[offset:offset+model_len].decode('utf-8')
+        model = str(data[offset:offset+model_len], 'utf-8')
         offset += model_len
         
         # Read dimension
-        dimension = struct.unpack('I', data[offset:offset+4])[0]
+        dimension = struct.unpack_from('I', data, offset)[0]
         offset += 4
         
         # Read distance metric
-        distance_metric_len = struct.unpack('I', data[offset:offset+4])[0]
+        distance_metric_len = struct.unpack_from('I', data, offset)[0]
         offset += 4
-        distance_metric = data[offset:offset+distance_metric_len].decode('utf-8')
+        distance_metric = str(data[offset:offset+distance_metric_len], 'utf-8')
         offset += distance_metric_len
         
         # Read vector
-        vector_len = struct.unpack('I', data[offset:offset+4])[0]
+        vector_len = struct.unpack_from('I', data, offset)[0]
         offset += 4
         vector_bytes = data[offset:offset+vector_len]
         offset += vector_len
         
         # Read metadata
-        metadata_len = struct.unpack('I', data[offset:offset+4])[0]
+        metadata_len = struct.unpack_from('I', data, offset)[0]
         offset += 4
-        metadata_bytes = data[offset:offset+metadata_len]
-        metadata = json.loads(metadata_bytes.decode('utf-8'))
+        metadata = json.loads(str(data[offset:offset+metadata_len], 'utf-8'))
         
         # Reconstruct vector
         vector = np.frombuffer(vector_bytes, dtype=np.float32)
@@ -235,7 +278,7 @@ class SimpleAssetKindEncoder:
     @staticmethod
     def decode_artifact(data: bytes) -> ArtifactData:
         """Decode artifact data from ZIP+MANIFEST format."""
-        artifact_dict = json.loads(data.decode('utf-8'))
+        artifact_dict = json.loads(str(data, 'utf-8'))
         
         return ArtifactData(
             files=artifact_dict['files'],
@@ -251,7 +294,7 @@ class SimpleAssetKindValidator:
     @staticmethod
     def validate_blob(data: bytes, metadata: Optional[Dict] = None) -> bool:
         """Validate blob data."""
-        return isinstance(data, bytes)  # Empty blobs are valid
+        return isinstance(data, (bytes, bytearray, memoryview))  # Empty blobs are valid
     
     @staticmethod
     def validate_tensor(data: bytes) -> bool:
@@ -285,7 +328,7 @@ def create_tensor_from_numpy(array: np.ndarray,
                            name: str = "tensor",
                            description: str = "",
                            creator: str = "",
-                           attributes: Optional[Dict[str, Any]] = None) -> bytes:
+                           attributes: Optional[Dict[str, Any]] = None) -> bytearray:
     """Convenience function to create tensor from numpy array."""
     tensor_data = TensorData(
         data=array,
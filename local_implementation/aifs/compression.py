@@ -3,6 +3,7 @@
 Implements zstd compression support as required by the AIFS specification.
 """
 
+import threading
 import zstandard
 from typing import Optional, Tuple, Dict, List
 
@@ -22,12 +23,17 @@ class CompressionService:
         self.compression_level = compression_level
         self.compressor = zstandard.ZstdCompressor(level=compression_level)
         self.decompressor = zstandard.ZstdDecompressor()
+        
+        # zstd contexts must not be used by two threads at once, so compress()
+        # and decompress() keep their own per thread (compressors per level)
+        self._local = threading.local()
     
-    def compress(self, data: bytes) -> bytes:
+    def compress(self, data: bytes, level: Optional[int] = None) -> bytes:
         """Compress data using zstd.
         
         Args:
             data: Raw data to compress
+            level: Optional zstd level for this call (defaults to the service level)
             
         Returns:
             Compressed data
@@ -38,7 +44,27 @@ class CompressionService:
         if not data:
             return b""
         
-        return self.compressor.compress(data)
+        return self._compressor(self.compression_level if level is None else level).compress(data)
+    
+    def _compressor(self, level: int) -> zstandard.ZstdCompressor:
+        """Get this thread's compressor for a level.
+        
+        Args:
+            level: zstd compression level (1-22)
+            
+        Returns:
+            Compressor for the level
+        """
+        compressors = getattr(self._local, "compressors", None)
+        if compressors is None:
+            compressors = self._local.compressors = {}
+        
+        compressor = compressors.get(level)
+        if compressor is None:
+            if not 1 <= level <= 22:
+                raise ValueError("Compression level must be between 1 and 22")
+            compressor = compressors[level] = zstandard.ZstdCompressor(level=level)
+        return compressor
     
     def decompress(self, compressed_data: bytes) -> bytes:
         """Decompress data using zstd.
@@ -55,8 +81,12 @@ class CompressionService:
         if not compressed_data:
             return b""
         
+        decompressor = getattr(self._local, "decompressor", None)
+        if decompressor is None:
+            decompressor = self._local.decompressor = zstandard.ZstdDecompressor()
+        
         try:
-            return self.decompressor.decompress(compressed_data)
+            return decompressor.decompress(compressed_data)
         except Exception as e:
             raise ValueError(f"Failed to decompress data: {e}")
     
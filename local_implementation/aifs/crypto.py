@@ -35,6 +35,10 @@ class CryptoManager:
         
         self.verify_key = self.signing_key.verify_key
         
+        # The key pair never changes, so encode the public key once
+        self._public_key = self.verify_key.encode()
+        self._public_key_hex = self._public_key.hex()
+        
         # Initialize key management database
         self.key_db_path = key_db_path or ":memory:"
         self._init_key_db()
@@ -74,7 +78,7 @@ class CryptoManager:
         Returns:
             Public key bytes
         """
-        return bytes(self.verify_key)
+        return self._public_key
     
     def get_public_key_hex(self) -> str:
         """Get the public key as hex string.
@@ -82,7 +86,13 @@ class CryptoManager:
         Returns:
             Public key as hex string
         """
-        return self.verify_key.encode().hex()
+        return self._public_key_hex
+    
+    def _verify_key_for(self, public_key: bytes) -> VerifyKey:
+        """Get a verify key for public key bytes, reusing our own when they match."""
+        if public_key == self._public_key:
+            return self.verify_key
+        return VerifyKey(public_key)
     
     def register_namespace_key(self, namespace: str, metadata: Optional[Dict] = None) -> str:
         """Register the current public key for a namespace.
@@ -276,7 +286,7 @@ class CryptoManager:
             True if signature is valid, False otherwise
         """
         try:
-            verify_key = VerifyKey(public_key)
+            verify_key = self._verify_key_for(public_key)
             
             # Convert hex string to bytes if needed
             if isinstance(signature, str):
@@ -387,7 +397,7 @@ class CryptoManager:
             True if signature is valid, False otherwise
         """
         try:
-            verify_key = VerifyKey(public_key)
+            verify_key = self._verify_key_for(public_key)
             
             # Convert hex string to bytes if needed
             if isinstance(signature, str):
@@ -416,7 +426,7 @@ class CryptoManager:
             True if signature is valid, False otherwise
         """
         try:
-            verify_key = VerifyKey(public_key)
+            verify_key = self._verify_key_for(public_key)
             message = f"{asset_id}:{metadata}".encode()
             verify_key.verify(message, signature)
             return True
@@ -4,6 +4,7 @@ Provides simple text embedding functionality for vector search.
 """
 
 import hashlib
+import blake3
 import numpy as np
 from typing import Union, List
 
@@ -38,25 +39,23 @@ class SimpleTextEmbedder:
         
         # Create a deterministic vector from the text
         # This is a simple approach - in production use proper embedding models
-        vector = np.zeros(self.dimension, dtype=np.float32)
         
-        # Use multiple hash functions to fill the vector
-        for i in range(0, self.dimension, 64):  # Process in 64-byte chunks
-            # Create different hash variants
-            hash_input = text_bytes + str(i).encode('utf-8')
-            import blake3
-            hash_value = blake3.blake3(hash_input).digest()
-            
-            # Convert hash bytes to float values
-            for j, byte_val in enumerate(hash_value):
-                if i + j < self.dimension:
-                    # Convert byte to float in [-1, 1] range
-                    vector[i + j] = (byte_val / 128.0) - 1.0
+        # Use multiple hash functions to fill the vector: each 64-wide chunk
+        # starts with the 32 bytes of its own hash variant and is zero after it
+        chunk_starts = range(0, self.dimension, 64)
+        digests = b"".join(
+            blake3.blake3(text_bytes + str(i).encode('utf-8')).digest() for i in chunk_starts
+        )
+        
+        # Convert hash bytes to float values in [-1, 1] range in one pass
+        chunks = np.zeros((len(chunk_starts), 64), dtype=np.float32)
+        chunks[:, :32] = (np.frombuffer(digests, dtype=np.uint8) / 128.0 - 1.0).reshape(-1, 32)
+        vector = chunks.reshape(-1)[:self.dimension]
         
-        # Normalize the vector
+        # Normalize the vector in place
         norm = np.linalg.norm(vector)
         if norm > 0:
-            vector = vector / norm
+            vector /= norm
             
         return vector
     
@@ -4,13 +4,19 @@ Implements Merkle tree functionality for snapshots.
 Uses BLAKE3 for hashing as specified in the AIFS architecture.
 """
 
-import blake3
+import json
+import threading
+from collections import OrderedDict
 from typing import List, Dict, Optional, Tuple
 
+import blake3
+
 
 class MerkleNode:
     """Represents a node in the Merkle tree."""
     
+    __slots__ = ("hash_value", "left", "right", "is_leaf")
+    
     def __init__(self, hash_value: str, left: Optional['MerkleNode'] = None, 
                  right: Optional['MerkleNode'] = None, is_leaf: bool = False):
         self.hash_value = hash_value
@@ -22,6 +28,43 @@ class MerkleNode:
         return f"MerkleNode(hash={self.hash_value[:8]}..., leaf={self.is_leaf})"
 
 
+class MerkleNodeCache:
+    """Bounded LRU cache of internal node hashes keyed by (left, right) child hashes.
+    
+    Sharing one cache across trees lets overlapping snapshots reuse the
+    subtrees they have in common instead of re-hashing them.
+    """
+    
+    def __init__(self, max_size: int = 65536):
+        """Initialize the cache.
+        
+        Args:
+            max_size: Maximum number of node hashes to keep
+        """
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Tuple[str, str]) -> Optional[str]:
+        """Return the cached hash for a child pair, or None."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+    
+    def put(self, key: Tuple[str, str], value: str) -> None:
+        """Cache the hash for a child pair, evicting the least recently used entry."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
 class MerkleTree:
     """Merkle tree implementation for AIFS snapshots.
     
@@ -30,14 +73,18 @@ class MerkleTree:
     Uses BLAKE3 for hashing as specified in the AIFS architecture.
     """
     
-    def __init__(self, asset_ids: List[str]):
+    def __init__(self, asset_ids: List[str], node_cache: Optional[MerkleNodeCache] = None):
         """Initialize Merkle tree with asset IDs.
         
         Args:
             asset_ids: List of asset IDs (BLAKE3 hashes)
+            node_cache: Optional cache of internal node hashes shared between trees
         """
         # Sort asset IDs for deterministic tree structure
         self.asset_ids = sorted(asset_ids)
+        self.node_cache = node_cache
+        # Internal node hashes, bottom-up, one list per level (see serialize)
+        self._levels: List[List[str]] = []
         self.root = self._build_tree()
     
     def _build_tree(self) -> MerkleNode:
@@ -58,25 +105,78 @@ class MerkleTree:
         # Create leaf nodes
         leaves = [MerkleNode(asset_id, is_leaf=True) for asset_id in self.asset_ids]
         
-        # Build tree bottom-up
+        # Build tree bottom-up, one level per pass
+        hash_pair = self._hash_pair
         current_level = leaves
         while len(current_level) > 1:
-            next_level = []
-            
-            # Process pairs of nodes
-            for i in range(0, len(current_level), 2):
-                left = current_level[i]
-                right = current_level[i + 1] if i + 1 < len(current_level) else left
-                
-                # Compute parent hash
-                parent_hash = self._hash_pair(left.hash_value, right.hash_value)
-                parent = MerkleNode(parent_hash, left, right)
-                next_level.append(parent)
+            if len(current_level) % 2:
+                # An odd node is paired with itself
+                current_level.append(current_level[-1])
             
-            current_level = next_level
+            current_level = [
+                MerkleNode(hash_pair(left.hash_value, right.hash_value), left, right)
+                for left, right in zip(current_level[0::2], current_level[1::2])
+            ]
+            self._levels.append([node.hash_value for node in current_level])
         
         return current_level[0]
     
+    def serialize(self) -> bytes:
+        """Serialize the tree so it can be restored without re-hashing.
+        
+        Returns:
+            JSON-encoded leaves and internal node hashes
+        """
+        return json.dumps(
+            {"leaves": self.asset_ids, "levels": self._levels}, separators=(',', ':')
+        ).encode('utf-8')
+    
+    @classmethod
+    def deserialize(cls, data: bytes, node_cache: Optional[MerkleNodeCache] = None) -> 'MerkleTree':
+        """Restore a tree produced by serialize.
+        
+        The stored hashes are linked back into nodes as-is; callers that do
+        not trust the source should compare the root with a known value.
+        
+        Args:
+            data: Output of serialize
+            node_cache: Optional cache of internal node hashes, used by verify_proof
+            
+        Returns:
+            MerkleTree with the same structure as the serialized one
+            
+        Raises:
+            ValueError: If the data does not describe a well-formed tree
+        """
+        payload = json.loads(data)
+        tree = cls.__new__(cls)
+        tree.asset_ids = payload["leaves"]
+        tree.node_cache = node_cache
+        tree._levels = payload["levels"]
+        
+        if len(tree.asset_ids) < 2:
+            if tree._levels:
+                raise ValueError("Malformed serialized Merkle tree")
+            tree.root = tree._build_tree()
+            return tree
+        
+        # Link each level to the one below, padding odd levels as _build_tree does
+        current_level = [MerkleNode(asset_id, is_leaf=True) for asset_id in tree.asset_ids]
+        for hashes in tree._levels:
+            if len(current_level) % 2:
+                current_level.append(current_level[-1])
+            if len(hashes) != len(current_level) // 2:
+                raise ValueError("Malformed serialized Merkle tree")
+            current_level = [
+                MerkleNode(hash_value, left, right)
+                for hash_value, left, right in zip(hashes, current_level[0::2], current_level[1::2])
+            ]
+        if len(current_level) != 1:
+            raise ValueError("Malformed serialized Merkle tree")
+        
+        tree.root = current_level[0]
+        return tree
+    
     def _hash_pair(self, left_hash: str, right_hash: str) -> str:
         """Hash a pair of hashes.
         
@@ -87,9 +187,18 @@ class MerkleTree:
         Returns:
             Hash of the concatenated pair
         """
+        if self.node_cache is not None:
+            cached = self.node_cache.get((left_hash, right_hash))
+            if cached is not None:
+                return cached
+        
         # Concatenate hashes and compute BLAKE3
         combined = f"{left_hash}:{right_hash}".encode()
-        return blake3.blake3(combined).hexdigest()
+        parent_hash = blake3.blake3(combined).hexdigest()
+        
+        if self.node_cache is not None:
+            self.node_cache.put((left_hash, right_hash), parent_hash)
+        return parent_hash
     
     def get_root_hash(self) -> str:
         """Get the root hash of the Merkle tree.
@@ -136,6 +245,34 @@ class MerkleTree:
         proof.reverse()
         return proof
     
+    def get_all_proofs(self) -> Dict[str, List[Tuple[str, str]]]:
+        """Get Merkle proofs for every asset in a single traversal of the tree.
+        
+        Equivalent to calling get_proof for each asset ID, but visits each node once.
+        
+        Returns:
+            Dictionary mapping asset ID to its proof (leaf-to-root (hash, direction) tuples)
+        """
+        if not self.asset_ids:
+            return {}
+        
+        proofs: Dict[str, List[Tuple[str, str]]] = {}
+        # Depth-first, left subtree first, carrying the root-to-node sibling path
+        stack: List[Tuple[MerkleNode, List[Tuple[str, str]]]] = [(self.root, [])]
+        while stack:
+            node, path = stack.pop()
+            if node.is_leaf:
+                # A duplicated odd node yields its leaves twice; keep the left-most path
+                # as get_proof does
+                proofs.setdefault(node.hash_value, path[::-1])
+                continue
+            if node.right:
+                stack.append((node.right, path + [(node.left.hash_value, "left")] if node.left else path))
+            if node.left:
+                stack.append((node.left, path + [(node.right.hash_value, "right")] if node.right else path))
+        
+        return proofs
+    
     def _get_leaf_hashes(self, node: MerkleNode) -> List[str]:
         """Get all leaf hashes under a node.
         
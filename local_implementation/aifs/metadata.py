@@ -5,12 +5,224 @@ Ensures snapshot root authenticity and integrity as specified in the AIFS archit
 """
 
 import json
+import math
 import os
+import queue
 import sqlite3
-from datetime import datetime
-from typing import Dict, List, Optional, Any, Union
+import threading
+from contextlib import contextmanager, nullcontext
+from datetime import date, datetime, time
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Tuple, Union
+from uuid import UUID
 from .crypto import CryptoManager
 
+# Metadata columns hold compact JSON text. Use orjson when available, falling
+# back to the stdlib encoder with whitespace stripped. Both encoders accept the
+# same value types, so whether metadata can be saved never depends on which
+# one ends up encoding it.
+def _json_default(obj: Any) -> Any:
+    # Types orjson serializes natively, rendered the same way
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, UUID):
+        return str(obj)
+    # numpy scalars and arrays
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _json_dumps(obj: Any) -> str:
+    return json.dumps(obj, separators=(',', ':'), default=_json_default)
+
+
+def _has_non_finite(obj: Any) -> bool:
+    """Check whether a value contains NaN or Infinity anywhere.
+    
+    Args:
+        obj: Value about to be encoded
+        
+    Returns:
+        True if any float (including numpy floats) is not finite
+    """
+    if isinstance(obj, float):
+        return not math.isfinite(obj)
+    if isinstance(obj, dict):
+        return any(_has_non_finite(value) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return any(_has_non_finite(value) for value in obj)
+    if hasattr(obj, "tolist"):
+        return _has_non_finite(obj.tolist())
+    return False
+
+
+try:
+    import orjson
+    
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    
+    def _dumps(obj: Any) -> str:
+        # orjson writes NaN and Infinity as null; the stdlib encoder keeps them
+        if _has_non_finite(obj):
+            return _json_dumps(obj)
+        try:
+            return orjson.dumps(obj, option=_ORJSON_OPTIONS).decode('utf-8')
+        except TypeError:
+            # e.g. ints beyond 64 bits, which the stdlib encoder accepts
+            return _json_dumps(obj)
+    
+    def _loads(data: Any) -> Any:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # NaN/Infinity written by the stdlib encoder
+            return json.loads(data)
+except ImportError:
+    _dumps = _json_dumps
+    _loads = json.loads
+
+# Applied to every new connection. WAL lets readers proceed while a write is in
+# flight and, with synchronous=NORMAL, avoids an fsync on every commit.
+_CONNECTION_PRAGMAS = """
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA busy_timeout=5000;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-20000;
+    PRAGMA mmap_size=268435456;
+"""
+
+# created_at value filled in by SQLite at insert time. Unlike the schema's
+# CURRENT_TIMESTAMP default this keeps the ISO-8601 "T" separator and
+# sub-second precision already stored by existing rows, so ORDER BY
+# created_at stays consistent.
+_SQL_NOW = "strftime('%Y-%m-%dT%H:%M:%f', 'now')"
+
+# Hot-path queries. Explicit column lists keep row unpacking independent of
+# column order, and reusing the same strings lets each connection's statement
+# cache hand back the already-compiled program.
+_SQL_GET_ASSET = (
+    "SELECT asset_id, kind, size, metadata, created_at FROM assets WHERE asset_id = ?"
+)
+_SQL_ASSET_EXISTS = "SELECT 1 FROM assets WHERE asset_id = ? AND kind != 'deleted' LIMIT 1"
+_SQL_COUNT_CHILDREN = "SELECT COUNT(*) FROM lineage WHERE parent_id = ?"
+# Stay well under SQLite's host-parameter limit for IN (...) lookups
+_MAX_IN_PARAMS = 500
+_SQL_GET_PARENTS = (
+    "SELECT a.asset_id, a.kind, a.size, a.metadata, a.created_at, l.transform_name, l.transform_digest "
+    "FROM assets a JOIN lineage l ON a.asset_id = l.parent_id WHERE l.child_id = ? "
+    "ORDER BY l.created_at DESC"
+)
+_SQL_GET_CHILDREN = (
+    "SELECT a.asset_id, a.kind, a.size, a.metadata, a.created_at, l.transform_name, l.transform_digest "
+    "FROM assets a JOIN lineage l ON a.asset_id = l.child_id WHERE l.parent_id = ? "
+    "ORDER BY l.created_at DESC"
+)
+# Batched lineage lookups; the leading column is the asset the edge was looked up by
+_SQL_GET_PARENTS_IN = (
+    "SELECT l.child_id, a.asset_id, a.kind, a.size, a.metadata, a.created_at, "
+    "l.transform_name, l.transform_digest "
+    "FROM assets a JOIN lineage l ON a.asset_id = l.parent_id WHERE l.child_id IN ({}) "
+    "ORDER BY l.created_at DESC"
+)
+_SQL_GET_CHILDREN_IN = (
+    "SELECT l.parent_id, a.asset_id, a.kind, a.size, a.metadata, a.created_at, "
+    "l.transform_name, l.transform_digest "
+    "FROM assets a JOIN lineage l ON a.asset_id = l.child_id WHERE l.parent_id IN ({}) "
+    "ORDER BY l.created_at DESC"
+)
+_SQL_GET_SNAPSHOT = (
+    "SELECT snapshot_id, namespace, merkle_root, metadata, signature, created_at "
+    "FROM snapshots WHERE snapshot_id = ?"
+)
+_SQL_GET_SNAPSHOT_ASSETS = (
+    "SELECT a.asset_id, a.kind, a.size, a.metadata, a.created_at "
+    "FROM assets a JOIN snapshot_assets sa ON a.asset_id = sa.asset_id WHERE sa.snapshot_id = ?"
+)
+_SQL_GET_NAMESPACE = (
+    "SELECT namespace_id, name, description, metadata, created_at FROM namespaces WHERE namespace_id = ?"
+)
+
+# Write statements. Keeping each as a single shared string means every
+# call hits the per-connection statement cache instead of re-preparing.
+_SQL_INSERT_ASSET = (
+    "INSERT OR REPLACE INTO assets (asset_id, kind, size, metadata, created_at) "
+    f"VALUES (?, ?, ?, ?, {_SQL_NOW})"
+)
+_SQL_INSERT_LINEAGE = (
+    "INSERT OR REPLACE INTO lineage (child_id, parent_id, transform_name, transform_digest, created_at) "
+    f"VALUES (?, ?, ?, ?, {_SQL_NOW})"
+)
+_SQL_INSERT_SNAPSHOT = (
+    "INSERT INTO snapshots (snapshot_id, namespace, merkle_root, metadata, signature, created_at) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+_SQL_INSERT_SNAPSHOT_MERKLE_TREE = (
+    "INSERT OR REPLACE INTO snapshot_merkle_trees (snapshot_id, tree) VALUES (?, ?)"
+)
+_SQL_GET_SNAPSHOT_MERKLE_TREE = "SELECT tree FROM snapshot_merkle_trees WHERE snapshot_id = ?"
+_SQL_INSERT_SNAPSHOT_ASSET = (
+    "INSERT OR IGNORE INTO snapshot_assets (snapshot_id, asset_id) VALUES (?, ?)"
+)
+_SQL_INSERT_NAMESPACE = (
+    "INSERT OR REPLACE INTO namespaces (namespace_id, name, created_at, metadata) "
+    f"VALUES (?, ?, {_SQL_NOW}, ?)"
+)
+_SQL_INSERT_BRANCH = (
+    "INSERT INTO branches (branch_name, namespace, snapshot_id, created_at, updated_at, metadata) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+_SQL_UPDATE_BRANCH = (
+    "UPDATE branches SET snapshot_id = ?, updated_at = ?, metadata = ? "
+    "WHERE branch_name = ? AND namespace = ?"
+)
+_SQL_INSERT_BRANCH_HISTORY = (
+    "INSERT INTO branch_history (branch_name, namespace, old_snapshot_id, new_snapshot_id, updated_at, metadata) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+_SQL_DELETE_BRANCH = "DELETE FROM branches WHERE branch_name = ? AND namespace = ?"
+_SQL_INSERT_TAG = (
+    "INSERT INTO tags (tag_name, namespace, snapshot_id, created_at, metadata) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+_SQL_DELETE_TAG = "DELETE FROM tags WHERE tag_name = ? AND namespace = ?"
+
+
+def _asset_row(row: Tuple) -> Dict:
+    """Build an asset dictionary from an (asset_id, kind, size, metadata, created_at) row."""
+    asset_id, kind, size, metadata_str, created_at = row
+    return {
+        "asset_id": asset_id,
+        "kind": kind,
+        "size": size,
+        "created_at": created_at,
+        "metadata": _loads(metadata_str) if metadata_str else {}
+    }
+
+
+def _lineage_row(row: Tuple) -> Dict:
+    """Build an asset dictionary with transform details from a lineage JOIN row."""
+    asset = _asset_row(row[:5])
+    asset["transform_name"] = row[5]
+    asset["transform_digest"] = row[6]
+    return asset
+
+
+def split_parents(parents: Optional[Iterable[Dict]]) -> Tuple[Tuple, Tuple, Tuple]:
+    """Split parent dictionaries into parallel ID, transform name and digest tuples.
+    
+    Args:
+        parents: Parent assets as [{"asset_id": str, "transform_name": str, "transform_digest": str}]
+        
+    Returns:
+        Tuple of (parent_ids, transform_names, transform_digests)
+    """
+    columns = tuple(zip(*(
+        (parent["asset_id"], parent.get("transform_name"), parent.get("transform_digest"))
+        for parent in parents or ()
+    )))
+    return columns or ((), (), ())
+
 
 class MetadataStore:
     """Metadata store for AIFS using SQLite.
@@ -19,137 +231,226 @@ class MetadataStore:
     Integrates with CryptoManager for signature generation and verification.
     """
     
-    def __init__(self, db_path: str, crypto_manager: Optional[CryptoManager] = None):
+    def __init__(self, db_path: str, crypto_manager: Optional[CryptoManager] = None,
+                 pool_size: int = 8):
         """Initialize metadata store.
         
         Args:
             db_path: Path to SQLite database file
             crypto_manager: Optional crypto manager for signature operations
+            pool_size: Maximum number of idle connections kept for reuse
         """
         self.db_path = db_path
         self.crypto_manager = crypto_manager
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=pool_size)
+        # SQLite allows a single writer; serialize writes in-process instead of
+        # letting concurrent callers spin on "database is locked".
+        self._write_lock = threading.RLock()
         self._init_db()
     
+    def _new_conn(self) -> sqlite3.Connection:
+        """Open a new connection to the metadata database.
+        
+        Connections run in autocommit mode; multi-statement writes open their
+        own transaction with BEGIN.
+        
+        Returns:
+            SQLite connection usable from any thread
+        """
+        conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                               cached_statements=256, isolation_level=None)
+        conn.executescript(_CONNECTION_PRAGMAS)
+        return conn
+    
+    @contextmanager
+    def _connection(self, write: bool = False):
+        """Borrow a connection from the pool.
+        
+        Any transaction left open by the caller is rolled back before the
+        connection is returned to the pool.
+        
+        Args:
+            write: Hold the store's write lock while the connection is in use
+            
+        Yields:
+            SQLite connection
+        """
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._new_conn()
+        
+        try:
+            with self._write_lock if write else nullcontext():
+                yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+    
+    def close(self) -> None:
+        """Close all pooled connections."""
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+    
     def _init_db(self):
         """Initialize the SQLite database."""
         try:
             # Ensure the directory exists
             os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
             
-            # Create database connection
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Create tables
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS assets (
-                    asset_id TEXT PRIMARY KEY,
-                    kind TEXT NOT NULL,
-                    size INTEGER NOT NULL,
-                    metadata TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS lineage (
-                    child_id TEXT,
-                    parent_id TEXT,
-                    transform_name TEXT,
-                    transform_digest TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (child_id) REFERENCES assets (asset_id),
-                    FOREIGN KEY (parent_id) REFERENCES assets (asset_id)
-                )
-            ''')
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS snapshots (
-                    snapshot_id TEXT PRIMARY KEY,
-                    namespace TEXT NOT NULL,
-                    merkle_root TEXT NOT NULL,
-                    metadata TEXT,
-                    signature TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS snapshot_assets (
-                    snapshot_id TEXT NOT NULL,
-                    asset_id TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    PRIMARY KEY (snapshot_id, asset_id),
-                    FOREIGN KEY (snapshot_id) REFERENCES snapshots (snapshot_id),
-                    FOREIGN KEY (asset_id) REFERENCES assets (asset_id)
-                )
-            ''')
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS namespaces (
-                    namespace_id TEXT PRIMARY KEY,
-                    name TEXT UNIQUE NOT NULL,
-                    description TEXT,
-                    metadata TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Branches table - named pointers to snapshot roots with atomic updates
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS branches (
-                    branch_name TEXT NOT NULL,
-                    namespace TEXT NOT NULL,
-                    snapshot_id TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    metadata TEXT,
-                    PRIMARY KEY (branch_name, namespace),
-                    FOREIGN KEY (snapshot_id) REFERENCES snapshots (snapshot_id)
+            # Borrow a connection from the pool
+            with self._connection(write=True) as conn:
+                cursor = conn.cursor()
+                
+                # Create tables
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS assets (
+                        asset_id TEXT PRIMARY KEY,
+                        kind TEXT NOT NULL,
+                        size INTEGER NOT NULL,
+                        metadata TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS lineage (
+                        child_id TEXT,
+                        parent_id TEXT,
+                        transform_name TEXT,
+                        transform_digest TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        FOREIGN KEY (child_id) REFERENCES assets (asset_id),
+                        FOREIGN KEY (parent_id) REFERENCES assets (asset_id)
+                    )
+                ''')
+                
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS snapshots (
+                        snapshot_id TEXT PRIMARY KEY,
+                        namespace TEXT NOT NULL,
+                        merkle_root TEXT NOT NULL,
+                        metadata TEXT,
+                        signature TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS snapshot_assets (
+                        snapshot_id TEXT NOT NULL,
+                        asset_id TEXT NOT NULL,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        PRIMARY KEY (snapshot_id, asset_id),
+                        FOREIGN KEY (snapshot_id) REFERENCES snapshots (snapshot_id),
+                        FOREIGN KEY (asset_id) REFERENCES assets (asset_id)
+                    )
+                ''')
+                
+                # Serialized Merkle trees, so reads can skip re-hashing a snapshot
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS snapshot_merkle_trees (
+                        snapshot_id TEXT PRIMARY KEY,
+                        tree BLOB NOT NULL,
+                        FOREIGN KEY (snapshot_id) REFERENCES snapshots (snapshot_id)
+                    )
+                ''')
+                
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS namespaces (
+                        namespace_id TEXT PRIMARY KEY,
+                        name TEXT UNIQUE NOT NULL,
+                        description TEXT,
+                        metadata TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                
+                # Branches table - named pointers to snapshot roots with atomic updates
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS branches (
+                        branch_name TEXT NOT NULL,
+                        namespace TEXT NOT NULL,
+                        snapshot_id TEXT NOT NULL,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        metadata TEXT,
+                        PRIMARY KEY (branch_name, namespace),
+                        FOREIGN KEY (snapshot_id) REFERENCES snapshots (snapshot_id)
+                    )
+                ''')
+                
+                # Tags table - immutable labels for audit-grade provenance
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS tags (
+                        tag_name TEXT NOT NULL,
+                        namespace TEXT NOT NULL,
+                        snapshot_id TEXT NOT NULL,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        metadata TEXT,
+                        PRIMARY KEY (tag_name, namespace),
+                        FOREIGN KEY (snapshot_id) REFERENCES snapshots (snapshot_id)
+                    )
+                ''')
+                
+                # Branch history table - track branch updates for audit trail
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS branch_history (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        branch_name TEXT NOT NULL,
+                        namespace TEXT NOT NULL,
+                        old_snapshot_id TEXT,
+                        new_snapshot_id TEXT NOT NULL,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        metadata TEXT,
+                        FOREIGN KEY (old_snapshot_id) REFERENCES snapshots (snapshot_id),
+                        FOREIGN KEY (new_snapshot_id) REFERENCES snapshots (snapshot_id)
+                    )
+                ''')
+                
+                # Create indexes for better performance
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_assets_kind ON assets (kind)')
+                # Covering indexes let parent/child lookups run as index-only scans;
+                # they supersede the old single-column lineage indexes.
+                lineage_indexes = {row[0] for row in cursor.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'lineage'"
+                )}
+                lineage_indexes_changed = bool(
+                    lineage_indexes & {'idx_lineage_asset_id', 'idx_lineage_parent_id'}
+                    or {'idx_lineage_child_cov', 'idx_lineage_parent_cov'} - lineage_indexes
                 )
-            ''')
-            
-            # Tags table - immutable labels for audit-grade provenance
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS tags (
-                    tag_name TEXT NOT NULL,
-                    namespace TEXT NOT NULL,
-                    snapshot_id TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    metadata TEXT,
-                    PRIMARY KEY (tag_name, namespace),
-                    FOREIGN KEY (snapshot_id) REFERENCES snapshots (snapshot_id)
-                )
-            ''')
-            
-            # Branch history table - track branch updates for audit trail
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS branch_history (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    branch_name TEXT NOT NULL,
-                    namespace TEXT NOT NULL,
-                    old_snapshot_id TEXT,
-                    new_snapshot_id TEXT NOT NULL,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    metadata TEXT,
-                    FOREIGN KEY (old_snapshot_id) REFERENCES snapshots (snapshot_id),
-                    FOREIGN KEY (new_snapshot_id) REFERENCES snapshots (snapshot_id)
-                )
-            ''')
-            
-            # Create indexes for better performance
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_assets_kind ON assets (kind)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_lineage_asset_id ON lineage (child_id)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_lineage_parent_id ON lineage (parent_id)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_snapshots_namespace ON snapshots (namespace)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_branches_namespace ON branches (namespace)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_tags_namespace ON tags (namespace)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_branch_history_branch ON branch_history (branch_name, namespace)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_snapshot_assets_snapshot ON snapshot_assets (snapshot_id)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_snapshot_assets_asset ON snapshot_assets (asset_id)')
-            
-            conn.commit()
-            conn.close()
+                cursor.execute('DROP INDEX IF EXISTS idx_lineage_asset_id')
+                cursor.execute('DROP INDEX IF EXISTS idx_lineage_parent_id')
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_lineage_child_cov ON lineage
+                    (child_id, created_at DESC, parent_id, transform_name, transform_digest)
+                ''')
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_lineage_parent_cov ON lineage
+                    (parent_id, created_at DESC, child_id, transform_name, transform_digest)
+                ''')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_snapshots_namespace ON snapshots (namespace)')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_branches_namespace ON branches (namespace)')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_tags_namespace ON tags (namespace)')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_branch_history_branch ON branch_history (branch_name, namespace)')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_snapshot_assets_snapshot ON snapshot_assets (snapshot_id)')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_snapshot_assets_asset ON snapshot_assets (asset_id)')
+                
+                conn.commit()
+                
+                # Refresh planner statistics so the covering indexes get picked.
+                # ANALYZE scans every table, so only run it when the lineage
+                # indexes were just created or replaced.
+                if lineage_indexes_changed:
+                    cursor.execute('ANALYZE')
             
    
         except Exception as e:
@@ -166,19 +467,30 @@ class MetadataStore:
             size: Asset size in bytes
             metadata: Optional metadata dictionary
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        created_at = datetime.utcnow().isoformat()
-        metadata_str = json.dumps(metadata) if metadata else None
-        
-        cursor.execute(
-            "INSERT OR REPLACE INTO assets (asset_id, kind, size, metadata, created_at) VALUES (?, ?, ?, ?, ?)",
-            (asset_id, kind, size, metadata_str, created_at)
-        )
+        self.add_assets_bulk([(asset_id, kind, size, metadata)])
+    
+    def add_assets_bulk(self, assets: Iterable[Tuple[str, str, int, Optional[Dict]]],
+                        lineage: Optional[Iterable[Tuple[str, str, Optional[str], Optional[str]]]] = None) -> None:
+        """Add metadata for many assets in a single transaction.
         
-        conn.commit()
-        conn.close()
+        Args:
+            assets: Iterable of (asset_id, kind, size, metadata) tuples
+            lineage: Optional iterable of (child_id, parent_id, transform_name, transform_digest)
+                     tuples written in the same transaction
+        """
+        rows = [
+            (asset_id, kind, size, _dumps(metadata) if metadata else None)
+            for asset_id, kind, size, metadata in assets
+        ]
+        edges = list(lineage) if lineage else []
+        if not rows and not edges:
+            return
+        
+        with self._connection(write=True) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(_SQL_INSERT_ASSET, rows)
+            conn.executemany(_SQL_INSERT_LINEAGE, edges)
+            conn.commit()
     
     def get_asset(self, asset_id: str) -> Optional[Dict]:
         """Get asset metadata.
@@ -189,27 +501,47 @@ class MetadataStore:
         Returns:
             Asset metadata dictionary or None if not found
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM assets WHERE asset_id = ?", (asset_id,))
-        row = cursor.fetchone()
-        
-        conn.close()
+        with self._connection() as conn:
+            row = conn.execute(_SQL_GET_ASSET, (asset_id,)).fetchone()
         
-        if not row:
-            return None
+        return _asset_row(row) if row else None
+    
+    def asset_exists(self, asset_id: str) -> bool:
+        """Check whether an asset has metadata and has not been marked deleted.
         
-        asset_id, kind, size, metadata_str, created_at = row
-        metadata = json.loads(metadata_str) if metadata_str else {}
+        Args:
+            asset_id: Asset ID (BLAKE3 hash)
+            
+        Returns:
+            True if the asset exists, False otherwise
+        """
+        with self._connection() as conn:
+            row = conn.execute(_SQL_ASSET_EXISTS, (asset_id,)).fetchone()
+        return row is not None
+    
+    def get_assets_bulk(self, asset_ids: Iterable[str]) -> Dict[str, Dict]:
+        """Get metadata for many assets with batched IN (...) queries.
         
-        return {
-            "asset_id": asset_id,
-            "kind": kind,
-            "size": size,
-            "created_at": created_at,
-            "metadata": metadata
-        }
+        Args:
+            asset_ids: Asset IDs to look up
+            
+        Returns:
+            Dictionary mapping asset ID to asset metadata; unknown IDs are omitted
+        """
+        ids = list(dict.fromkeys(asset_ids))
+        assets = {}
+        with self._connection() as conn:
+            for start in range(0, len(ids), _MAX_IN_PARAMS):
+                batch = ids[start:start + _MAX_IN_PARAMS]
+                placeholders = ",".join("?" * len(batch))
+                cursor = conn.execute(
+                    "SELECT asset_id, kind, size, metadata, created_at FROM assets "
+                    f"WHERE asset_id IN ({placeholders})",
+                    batch
+                )
+                for row in cursor:
+                    assets[row[0]] = _asset_row(row)
+        return assets
     
     def add_lineage(self, child_id: str, parent_id: str, transform_name: Optional[str] = None, 
                    transform_digest: Optional[str] = None) -> None:
@@ -221,19 +553,41 @@ class MetadataStore:
             transform_name: Optional name of the transformation
             transform_digest: Optional digest of the transformation (e.g., container hash)
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        self.add_lineage_bulk([(child_id, parent_id, transform_name, transform_digest)])
+    
+    def add_lineage_bulk(self, edges: Iterable[Tuple[str, str, Optional[str], Optional[str]]]) -> None:
+        """Add many lineage edges in a single transaction.
         
-        created_at = datetime.utcnow().isoformat()
+        Args:
+            edges: Iterable of (child_id, parent_id, transform_name, transform_digest) tuples
+        """
+        rows = [
+            (child_id, parent_id, transform_name, transform_digest)
+            for child_id, parent_id, transform_name, transform_digest in edges
+        ]
+        if not rows:
+            return
+        
+        with self._connection(write=True) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(_SQL_INSERT_LINEAGE, rows)
+            conn.commit()
+    
+    def add_lineage_batch(self, child_id: str, parent_ids: Iterable[str],
+                          transform_names: Iterable[Optional[str]],
+                          transform_digests: Iterable[Optional[str]]) -> None:
+        """Add lineage edges from one child to many parents in a single transaction.
         
-        cursor.execute(
-            "INSERT OR REPLACE INTO lineage (child_id, parent_id, transform_name, transform_digest, created_at) "
-            "VALUES (?, ?, ?, ?, ?)",
-            (child_id, parent_id, transform_name, transform_digest, created_at)
+        Args:
+            child_id: Child asset ID
+            parent_ids: Parent asset IDs
+            transform_names: Transform name for each parent
+            transform_digests: Transform digest for each parent
+        """
+        self.add_lineage_bulk(
+            (child_id, parent_id, transform_name, transform_digest)
+            for parent_id, transform_name, transform_digest in zip(parent_ids, transform_names, transform_digests)
         )
-        
-        conn.commit()
-        conn.close()
     
     def get_parents(self, asset_id: str) -> List[Dict]:
         """Get parent assets.
@@ -244,35 +598,55 @@ class MetadataStore:
         Returns:
             List of parent asset metadata dictionaries
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-        SELECT a.*, l.transform_name, l.transform_digest
-        FROM assets a
-        JOIN lineage l ON a.asset_id = l.parent_id
-        WHERE l.child_id = ?
-        """, (asset_id,))
+        with self._connection() as conn:
+            return [_lineage_row(row) for row in conn.execute(_SQL_GET_PARENTS, (asset_id,))]
+    
+    def get_parents_bulk(self, asset_ids: Iterable[str]) -> Dict[str, List[Dict]]:
+        """Get the parents of many assets with batched IN (...) queries.
         
-        rows = cursor.fetchall()
-        conn.close()
+        Args:
+            asset_ids: Asset IDs to look up
+            
+        Returns:
+            Dictionary mapping every requested asset ID to its list of parent
+            asset metadata dictionaries
+        """
+        return self._lineage_bulk(_SQL_GET_PARENTS_IN, asset_ids)
+    
+    def get_children_bulk(self, asset_ids: Iterable[str]) -> Dict[str, List[Dict]]:
+        """Get the children of many assets with batched IN (...) queries.
         
-        parents = []
-        for row in rows:
-            asset_id, kind, size, metadata_str, created_at, transform_name, transform_digest = row
-            metadata = json.loads(metadata_str) if metadata_str else {}
+        Args:
+            asset_ids: Asset IDs to look up
             
-            parents.append({
-                "asset_id": asset_id,
-                "kind": kind,
-                "size": size,
-                "created_at": created_at,
-                "metadata": metadata,
-                "transform_name": transform_name,
-                "transform_digest": transform_digest
-            })
+        Returns:
+            Dictionary mapping every requested asset ID to its list of child
+            asset metadata dictionaries
+        """
+        return self._lineage_bulk(_SQL_GET_CHILDREN_IN, asset_ids)
+    
+    def _lineage_bulk(self, sql: str, asset_ids: Iterable[str]) -> Dict[str, List[Dict]]:
+        """Run a batched lineage query and group the rows by lookup ID."""
+        ids = list(dict.fromkeys(asset_ids))
+        lineage = {asset_id: [] for asset_id in ids}
+        with self._connection() as conn:
+            for start in range(0, len(ids), _MAX_IN_PARAMS):
+                batch = ids[start:start + _MAX_IN_PARAMS]
+                for row in conn.execute(sql.format(",".join("?" * len(batch))), batch):
+                    lineage[row[0]].append(_lineage_row(row[1:]))
+        return lineage
+    
+    def count_children(self, asset_id: str) -> int:
+        """Count the assets derived from an asset.
         
-        return parents
+        Args:
+            asset_id: Asset ID
+            
+        Returns:
+            Number of child lineage edges
+        """
+        with self._connection() as conn:
+            return conn.execute(_SQL_COUNT_CHILDREN, (asset_id,)).fetchone()[0]
     
     def get_children(self, asset_id: str) -> List[Dict]:
         """Get child assets.
@@ -283,38 +657,13 @@ class MetadataStore:
         Returns:
             List of child asset metadata dictionaries
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-        SELECT a.*, l.transform_name, l.transform_digest
-        FROM assets a
-        JOIN lineage l ON a.asset_id = l.child_id
-        WHERE l.parent_id = ?
-        """, (asset_id,))
-        
-        rows = cursor.fetchall()
-        conn.close()
-        
-        children = []
-        for row in rows:
-            asset_id, kind, size, metadata_str, created_at, transform_name, transform_digest = row
-            metadata = json.loads(metadata_str) if metadata_str else {}
-            
-            children.append({
-                "asset_id": asset_id,
-                "kind": kind,
-                "size": size,
-                "created_at": created_at,
-                "metadata": metadata,
-                "transform_name": transform_name,
-                "transform_digest": transform_digest
-            })
-        
-        return children
+        with self._connection() as conn:
+            return [_lineage_row(row) for row in conn.execute(_SQL_GET_CHILDREN, (asset_id,))]
     
     def create_snapshot(self, namespace: str, merkle_root: str, metadata: Optional[Dict] = None,
-                       signature: str = None, created_at: str = None, auto_sign: bool = True) -> str:
+                       signature: str = None, created_at: str = None, auto_sign: bool = True,
+                       merkle_tree: Optional[bytes] = None,
+                       asset_ids: Optional[Iterable[str]] = None) -> str:
         """Create a new snapshot with Ed25519 signature.
         
         Creates a snapshot and automatically signs it if a crypto manager is available
@@ -328,19 +677,18 @@ class MetadataStore:
             signature: Optional pre-computed Ed25519 signature
             created_at: ISO timestamp string
             auto_sign: Whether to automatically sign the snapshot if crypto manager is available
+            merkle_tree: Optional serialized Merkle tree (MerkleTree.serialize) to store with it
+            asset_ids: Optional IDs of the assets in the snapshot, added in the same transaction
         
         Returns:
             Snapshot ID
         """
         import blake3
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         if created_at is None:
             created_at = datetime.utcnow().isoformat()
         
-        metadata_str = json.dumps(metadata) if metadata else None
+        metadata_str = _dumps(metadata) if metadata else None
         
         # Generate snapshot ID from merkle root and timestamp
         snapshot_id_input = f"{merkle_root}:{created_at}"
@@ -357,17 +705,33 @@ class MetadataStore:
             )
             signature = signature_hex
         
-        cursor.execute(
-            "INSERT INTO snapshots (snapshot_id, namespace, merkle_root, metadata, signature, created_at) "
-            "VALUES (?, ?, ?, ?, ?, ?)",
-            (snapshot_id, namespace, merkle_root, metadata_str, signature, created_at)
-        )
-        
-        conn.commit()
-        conn.close()
+        with self._connection(write=True) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                _SQL_INSERT_SNAPSHOT,
+                (snapshot_id, namespace, merkle_root, metadata_str, signature, created_at)
+            )
+            if merkle_tree is not None:
+                conn.execute(_SQL_INSERT_SNAPSHOT_MERKLE_TREE, (snapshot_id, merkle_tree))
+            if asset_ids is not None:
+                conn.executemany(_SQL_INSERT_SNAPSHOT_ASSET, [(snapshot_id, asset_id) for asset_id in asset_ids])
+            conn.commit()
         
         return snapshot_id
     
+    def get_snapshot_merkle_tree(self, snapshot_id: str) -> Optional[bytes]:
+        """Get the serialized Merkle tree stored with a snapshot.
+        
+        Args:
+            snapshot_id: Snapshot ID
+            
+        Returns:
+            Serialized tree, or None if none was stored
+        """
+        with self._connection() as conn:
+            row = conn.execute(_SQL_GET_SNAPSHOT_MERKLE_TREE, (snapshot_id,)).fetchone()
+        return row[0] if row else None
+    
     def verify_snapshot_signature(self, snapshot_id: str) -> bool:
         """Verify the Ed25519 signature of a snapshot.
         
@@ -455,16 +819,23 @@ class MetadataStore:
             snapshot_id: Snapshot ID
             asset_id: Asset ID
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        self.add_assets_to_snapshot_bulk(snapshot_id, [asset_id])
+    
+    def add_assets_to_snapshot_bulk(self, snapshot_id: str, asset_ids: Iterable[str]) -> None:
+        """Add many assets to a snapshot in a single transaction.
         
-        cursor.execute(
-            "INSERT OR IGNORE INTO snapshot_assets (snapshot_id, asset_id) VALUES (?, ?)",
-            (snapshot_id, asset_id)
-        )
+        Args:
+            snapshot_id: Snapshot ID
+            asset_ids: Asset IDs to include in the snapshot
+        """
+        rows = [(snapshot_id, asset_id) for asset_id in asset_ids]
+        if not rows:
+            return
         
-        conn.commit()
-        conn.close()
+        with self._connection(write=True) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(_SQL_INSERT_SNAPSHOT_ASSET, rows)
+            conn.commit()
     
     def get_snapshot(self, snapshot_id: str) -> Optional[Dict]:
         """Get snapshot metadata with signature.
@@ -475,42 +846,16 @@ class MetadataStore:
         Returns:
             Snapshot metadata dictionary or None if not found
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM snapshots WHERE snapshot_id = ?", (snapshot_id,))
-        row = cursor.fetchone()
-        
-        if not row:
-            conn.close()
-            return None
+        with self._connection() as conn:
+            row = conn.execute(_SQL_GET_SNAPSHOT, (snapshot_id,)).fetchone()
+            if not row:
+                return None
+            
+            # Get assets in snapshot
+            assets = [_asset_row(asset_row) for asset_row in conn.execute(_SQL_GET_SNAPSHOT_ASSETS, (snapshot_id,))]
         
         snapshot_id, namespace, merkle_root, metadata_str, signature, created_at = row
-        metadata = json.loads(metadata_str) if metadata_str else {}
-        
-        # Get assets in snapshot
-        cursor.execute("""
-        SELECT a.*
-        FROM assets a
-        JOIN snapshot_assets sa ON a.asset_id = sa.asset_id
-        WHERE sa.snapshot_id = ?
-        """, (snapshot_id,))
-        
-        asset_rows = cursor.fetchall()
-        conn.close()
-        
-        assets = []
-        for row in asset_rows:
-            asset_id, kind, size, metadata_str, asset_created_at = row
-            asset_metadata = json.loads(metadata_str) if metadata_str else {}
-            
-            assets.append({
-                "asset_id": asset_id,
-                "kind": kind,
-                "size": size,
-                "created_at": asset_created_at,
-                "metadata": asset_metadata
-            })
+        metadata = _loads(metadata_str) if metadata_str else {}
         
         return {
             "snapshot_id": snapshot_id,
@@ -522,6 +867,21 @@ class MetadataStore:
             "assets": assets
         }
     
+    def iter_snapshot_assets(self, snapshot_id: str) -> Iterator[Dict]:
+        """Iterate over the assets in a snapshot without materializing them all.
+        
+        The pooled connection is held until the iterator is exhausted or closed.
+        
+        Args:
+            snapshot_id: Snapshot ID
+            
+        Yields:
+            Asset metadata dictionaries
+        """
+        with self._connection() as conn:
+            for row in conn.execute(_SQL_GET_SNAPSHOT_ASSETS, (snapshot_id,)):
+                yield _asset_row(row)
+    
     def list_snapshots(self, namespace: Optional[str] = None, limit: int = 100) -> List[Dict]:
         """List snapshots with optional namespace filter.
         
@@ -532,37 +892,35 @@ class MetadataStore:
         Returns:
             List of snapshot dictionaries
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        if namespace:
-            cursor.execute(
-                "SELECT snapshot_id, namespace, merkle_root, metadata, signature, created_at "
-                "FROM snapshots WHERE namespace = ? ORDER BY created_at DESC LIMIT ?",
-                (namespace, limit)
-            )
-        else:
-            cursor.execute(
-                "SELECT snapshot_id, namespace, merkle_root, metadata, signature, created_at "
-                "FROM snapshots ORDER BY created_at DESC LIMIT ?",
-                (limit,)
-            )
-        
-        snapshots = []
-        for row in cursor.fetchall():
-            snapshot_id, namespace, merkle_root, metadata_str, signature, created_at = row
-            metadata = json.loads(metadata_str) if metadata_str else {}
+        with self._connection() as conn:
+            cursor = conn.cursor()
             
-            snapshots.append({
-                "snapshot_id": snapshot_id,
-                "namespace": namespace,
-                "merkle_root": merkle_root,
-                "created_at": created_at,
-                "signature": signature,
-                "metadata": metadata
-            })
-        
-        conn.close()
+            if namespace:
+                cursor.execute(
+                    "SELECT snapshot_id, namespace, merkle_root, metadata, signature, created_at "
+                    "FROM snapshots WHERE namespace = ? ORDER BY created_at DESC LIMIT ?",
+                    (namespace, limit)
+                )
+            else:
+                cursor.execute(
+                    "SELECT snapshot_id, namespace, merkle_root, metadata, signature, created_at "
+                    "FROM snapshots ORDER BY created_at DESC LIMIT ?",
+                    (limit,)
+                )
+            
+            snapshots = []
+            for row in cursor:
+                snapshot_id, namespace, merkle_root, metadata_str, signature, created_at = row
+                metadata = _loads(metadata_str) if metadata_str else {}
+                
+                snapshots.append({
+                    "snapshot_id": snapshot_id,
+                    "namespace": namespace,
+                    "merkle_root": merkle_root,
+                    "created_at": created_at,
+                    "signature": signature,
+                    "metadata": metadata
+                })
         return snapshots
     
     def create_namespace(self, name: str, metadata: Optional[Dict] = None) -> str:
@@ -575,23 +933,13 @@ class MetadataStore:
         Returns:
             Namespace ID
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        created_at = datetime.utcnow().isoformat()
-        metadata_str = json.dumps(metadata) if metadata else None
+        metadata_str = _dumps(metadata) if metadata else None
         
         # Use name as ID for simplicity
         namespace_id = name
         
-        cursor.execute(
-            "INSERT OR REPLACE INTO namespaces (namespace_id, name, created_at, metadata) "
-            "VALUES (?, ?, ?, ?)",
-            (namespace_id, name, created_at, metadata_str)
-        )
-        
-        conn.commit()
-        conn.close()
+        with self._connection(write=True) as conn:
+            conn.execute(_SQL_INSERT_NAMESPACE, (namespace_id, name, metadata_str))
         
         return namespace_id
     
@@ -604,19 +952,14 @@ class MetadataStore:
         Returns:
             Namespace dictionary or None if not found
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM namespaces WHERE namespace_id = ?", (namespace_id,))
-        row = cursor.fetchone()
-        
-        conn.close()
+        with self._connection() as conn:
+            row = conn.execute(_SQL_GET_NAMESPACE, (namespace_id,)).fetchone()
         
         if not row:
             return None
         
         namespace_id, name, description, metadata_str, created_at = row
-        metadata = json.loads(metadata_str) if metadata_str else {}
+        metadata = _loads(metadata_str) if metadata_str else {}
         
         return {
             "namespace_id": namespace_id,
@@ -632,28 +975,24 @@ class MetadataStore:
         Returns:
             List of namespace dictionaries
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM namespaces ORDER BY created_at DESC")
-        rows = cursor.fetchall()
-        
-        conn.close()
-        
-        namespaces = []
-        for row in rows:
-            namespace_id, name, description, metadata_str, created_at = row
-            metadata = json.loads(metadata_str) if metadata_str else {}
+        with self._connection() as conn:
+            cursor = conn.cursor()
             
-            namespaces.append({
-                "namespace_id": namespace_id,
-                "name": name,
-                "description": description,
-                "created_at": created_at,
-                "metadata": metadata
-            })
-        
-        return namespaces
+            cursor.execute(
+                "SELECT namespace_id, name, description, metadata, created_at "
+                "FROM namespaces ORDER BY created_at DESC"
+            )
+            
+            return [
+                {
+                    "namespace_id": namespace_id,
+                    "name": name,
+                    "description": description,
+                    "created_at": created_at,
+                    "metadata": _loads(metadata_str) if metadata_str else {}
+                }
+                for namespace_id, name, description, metadata_str, created_at in cursor
+            ]
     
     def list_assets(self, limit: int = 100, offset: int = 0) -> List[Dict]:
         """List assets.
@@ -665,33 +1004,17 @@ class MetadataStore:
         Returns:
             List of asset metadata dictionaries
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT asset_id, kind, size, created_at, metadata
-            FROM assets 
-            ORDER BY created_at DESC 
-            LIMIT ? OFFSET ?
-        """, (limit, offset))
-        
-        rows = cursor.fetchall()
-        conn.close()
-        
-        assets = []
-        for row in rows:
-            asset_id, kind, size, created_at, metadata_str = row
-            metadata = json.loads(metadata_str) if metadata_str else {}
+        with self._connection() as conn:
+            cursor = conn.cursor()
             
-            assets.append({
-                "asset_id": asset_id,
-                "kind": kind,
-                "size": size,
-                "created_at": created_at,
-                "metadata": metadata
-            })
-        
-        return assets
+            cursor.execute("""
+                SELECT asset_id, kind, size, metadata, created_at
+                FROM assets 
+                ORDER BY created_at DESC 
+                LIMIT ? OFFSET ?
+            """, (limit, offset))
+            
+            return [_asset_row(row) for row in cursor]
     
     # ============================================================================
     # Branch Management Methods
@@ -713,64 +1036,52 @@ class MetadataStore:
         Returns:
             True if successful, False otherwise
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        try:
-            # Start transaction
-            cursor.execute("BEGIN TRANSACTION")
-            
-            # Check if snapshot exists and is verified
-            snapshot = self.get_snapshot(snapshot_id)
-            if not snapshot:
-                raise ValueError(f"Snapshot {snapshot_id} not found")
-            
-            if not self.verify_snapshot_signature(snapshot_id):
-                raise ValueError(f"Snapshot {snapshot_id} signature verification failed")
-            
-            # Check if branch already exists
-            cursor.execute("""
-                SELECT snapshot_id FROM branches 
-                WHERE branch_name = ? AND namespace = ?
-            """, (branch_name, namespace))
-            
-            existing_branch = cursor.fetchone()
-            old_snapshot_id = existing_branch[0] if existing_branch else None
-            
-            metadata_str = json.dumps(metadata) if metadata else None
-            current_time = datetime.utcnow().isoformat()
+        with self._connection(write=True) as conn:
+            cursor = conn.cursor()
             
-            if existing_branch:
-                # Update existing branch
+            try:
+                # Start transaction
+                cursor.execute("BEGIN TRANSACTION")
+                
+                # Check if snapshot exists and is verified
+                snapshot = self.get_snapshot(snapshot_id)
+                if not snapshot:
+                    raise ValueError(f"Snapshot {snapshot_id} not found")
+                
+                if not self.verify_snapshot_signature(snapshot_id):
+                    raise ValueError(f"Snapshot {snapshot_id} signature verification failed")
+                
+                # Check if branch already exists
                 cursor.execute("""
-                    UPDATE branches 
-                    SET snapshot_id = ?, updated_at = ?, metadata = ?
+                    SELECT snapshot_id FROM branches 
                     WHERE branch_name = ? AND namespace = ?
-                """, (snapshot_id, current_time, metadata_str, branch_name, namespace))
-            else:
-                # Create new branch
-                cursor.execute("""
-                    INSERT INTO branches (branch_name, namespace, snapshot_id, created_at, updated_at, metadata)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (branch_name, namespace, snapshot_id, current_time, current_time, metadata_str))
-            
-            # Record in branch history for audit trail
-            cursor.execute("""
-                INSERT INTO branch_history (branch_name, namespace, old_snapshot_id, new_snapshot_id, updated_at, metadata)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (branch_name, namespace, old_snapshot_id, snapshot_id, current_time, metadata_str))
-            
-            # Commit transaction
-            cursor.execute("COMMIT")
-            conn.close()
-            return True
-            
-        except Exception as e:
-            # Rollback on error
-            cursor.execute("ROLLBACK")
-            conn.close()
-            print(f"Branch creation failed: {e}")
-            return False
+                """, (branch_name, namespace))
+                
+                existing_branch = cursor.fetchone()
+                old_snapshot_id = existing_branch[0] if existing_branch else None
+                
+                metadata_str = _dumps(metadata) if metadata else None
+                current_time = datetime.utcnow().isoformat()
+                
+                if existing_branch:
+                    # Update existing branch
+                    cursor.execute(_SQL_UPDATE_BRANCH, (snapshot_id, current_time, metadata_str, branch_name, namespace))
+                else:
+                    # Create new branch
+                    cursor.execute(_SQL_INSERT_BRANCH, (branch_name, namespace, snapshot_id, current_time, current_time, metadata_str))
+                
+                # Record in branch history for audit trail
+                cursor.execute(_SQL_INSERT_BRANCH_HISTORY, (branch_name, namespace, old_snapshot_id, snapshot_id, current_time, metadata_str))
+                
+                # Commit transaction
+                cursor.execute("COMMIT")
+                return True
+                
+            except Exception as e:
+                # Rollback on error
+                cursor.execute("ROLLBACK")
+                print(f"Branch creation failed: {e}")
+                return False
     
     def get_branch(self, branch_name: str, namespace: str) -> Optional[Dict]:
         """Get branch information.
@@ -782,23 +1093,22 @@ class MetadataStore:
         Returns:
             Branch dictionary or None if not found
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT branch_name, namespace, snapshot_id, created_at, updated_at, metadata
-            FROM branches 
-            WHERE branch_name = ? AND namespace = ?
-        """, (branch_name, namespace))
-        
-        row = cursor.fetchone()
-        conn.close()
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("""
+                SELECT branch_name, namespace, snapshot_id, created_at, updated_at, metadata
+                FROM branches 
+                WHERE branch_name = ? AND namespace = ?
+            """, (branch_name, namespace))
+            
+            row = cursor.fetchone()
         
         if not row:
             return None
         
         branch_name, namespace, snapshot_id, created_at, updated_at, metadata_str = row
-        metadata = json.loads(metadata_str) if metadata_str else {}
+        metadata = _loads(metadata_str) if metadata_str else {}
         
         return {
             "branch_name": branch_name,
@@ -819,32 +1129,31 @@ class MetadataStore:
         Returns:
             List of branch dictionaries
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        if namespace:
-            cursor.execute("""
-                SELECT branch_name, namespace, snapshot_id, created_at, updated_at, metadata
-                FROM branches 
-                WHERE namespace = ?
-                ORDER BY updated_at DESC 
-                LIMIT ?
-            """, (namespace, limit))
-        else:
-            cursor.execute("""
-                SELECT branch_name, namespace, snapshot_id, created_at, updated_at, metadata
-                FROM branches 
-                ORDER BY updated_at DESC 
-                LIMIT ?
-            """, (limit,))
-        
-        rows = cursor.fetchall()
-        conn.close()
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            
+            if namespace:
+                cursor.execute("""
+                    SELECT branch_name, namespace, snapshot_id, created_at, updated_at, metadata
+                    FROM branches 
+                    WHERE namespace = ?
+                    ORDER BY updated_at DESC 
+                    LIMIT ?
+                """, (namespace, limit))
+            else:
+                cursor.execute("""
+                    SELECT branch_name, namespace, snapshot_id, created_at, updated_at, metadata
+                    FROM branches 
+                    ORDER BY updated_at DESC 
+                    LIMIT ?
+                """, (limit,))
+            
+            rows = cursor.fetchall()
         
         branches = []
         for row in rows:
             branch_name, namespace, snapshot_id, created_at, updated_at, metadata_str = row
-            metadata = json.loads(metadata_str) if metadata_str else {}
+            metadata = _loads(metadata_str) if metadata_str else {}
             
             branches.append({
                 "branch_name": branch_name,
@@ -868,24 +1177,23 @@ class MetadataStore:
         Returns:
             List of branch history dictionaries
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT id, old_snapshot_id, new_snapshot_id, updated_at, metadata
-            FROM branch_history 
-            WHERE branch_name = ? AND namespace = ?
-            ORDER BY updated_at DESC 
-            LIMIT ?
-        """, (branch_name, namespace, limit))
-        
-        rows = cursor.fetchall()
-        conn.close()
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("""
+                SELECT id, old_snapshot_id, new_snapshot_id, updated_at, metadata
+                FROM branch_history 
+                WHERE branch_name = ? AND namespace = ?
+                ORDER BY updated_at DESC 
+                LIMIT ?
+            """, (branch_name, namespace, limit))
+            
+            rows = cursor.fetchall()
         
         history = []
         for row in rows:
             id, old_snapshot_id, new_snapshot_id, updated_at, metadata_str = row
-            metadata = json.loads(metadata_str) if metadata_str else {}
+            metadata = _loads(metadata_str) if metadata_str else {}
             
             history.append({
                 "id": id,
@@ -909,23 +1217,18 @@ class MetadataStore:
         Returns:
             True if successful, False otherwise
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute("""
-                DELETE FROM branches 
-                WHERE branch_name = ? AND namespace = ?
-            """, (branch_name, namespace))
-            
-            conn.commit()
-            conn.close()
-            return cursor.rowcount > 0
+        with self._connection(write=True) as conn:
+            cursor = conn.cursor()
             
-        except Exception as e:
-            conn.close()
-            print(f"Branch deletion failed: {e}")
-            return False
+            try:
+                cursor.execute(_SQL_DELETE_BRANCH, (branch_name, namespace))
+                
+                conn.commit()
+                return cursor.rowcount > 0
+                
+            except Exception as e:
+                print(f"Branch deletion failed: {e}")
+                return False
     
     # ============================================================================
     # Tag Management Methods
@@ -947,44 +1250,39 @@ class MetadataStore:
         Returns:
             True if successful, False otherwise
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        try:
-            # Check if tag already exists (tags are immutable)
-            cursor.execute("""
-                SELECT tag_name FROM tags 
-                WHERE tag_name = ? AND namespace = ?
-            """, (tag_name, namespace))
-            
-            if cursor.fetchone():
-                raise ValueError(f"Tag {tag_name} already exists in namespace {namespace} (tags are immutable)")
-            
-            # Check if snapshot exists and is verified
-            snapshot = self.get_snapshot(snapshot_id)
-            if not snapshot:
-                raise ValueError(f"Snapshot {snapshot_id} not found")
-            
-            if not self.verify_snapshot_signature(snapshot_id):
-                raise ValueError(f"Snapshot {snapshot_id} signature verification failed")
-            
-            metadata_str = json.dumps(metadata) if metadata else None
-            current_time = datetime.utcnow().isoformat()
-            
-            # Create tag
-            cursor.execute("""
-                INSERT INTO tags (tag_name, namespace, snapshot_id, created_at, metadata)
-                VALUES (?, ?, ?, ?, ?)
-            """, (tag_name, namespace, snapshot_id, current_time, metadata_str))
-            
-            conn.commit()
-            conn.close()
-            return True
+        with self._connection(write=True) as conn:
+            cursor = conn.cursor()
             
-        except Exception as e:
-            conn.close()
-            print(f"Tag creation failed: {e}")
-            return False
+            try:
+                # Check if tag already exists (tags are immutable)
+                cursor.execute("""
+                    SELECT tag_name FROM tags 
+                    WHERE tag_name = ? AND namespace = ?
+                """, (tag_name, namespace))
+                
+                if cursor.fetchone():
+                    raise ValueError(f"Tag {tag_name} already exists in namespace {namespace} (tags are immutable)")
+                
+                # Check if snapshot exists and is verified
+                snapshot = self.get_snapshot(snapshot_id)
+                if not snapshot:
+                    raise ValueError(f"Snapshot {snapshot_id} not found")
+                
+                if not self.verify_snapshot_signature(snapshot_id):
+                    raise ValueError(f"Snapshot {snapshot_id} signature verification failed")
+                
+                metadata_str = _dumps(metadata) if metadata else None
+                current_time = datetime.utcnow().isoformat()
+                
+                # Create tag
+                cursor.execute(_SQL_INSERT_TAG, (tag_name, namespace, snapshot_id, current_time, metadata_str))
+                
+                conn.commit()
+                return True
+                
+            except Exception as e:
+                print(f"Tag creation failed: {e}")
+                return False
     
     def get_tag(self, tag_name: str, namespace: str) -> Optional[Dict]:
         """Get tag information.
@@ -996,23 +1294,22 @@ class MetadataStore:
         Returns:
             Tag dictionary or None if not found
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT tag_name, namespace, snapshot_id, created_at, metadata
-            FROM tags 
-            WHERE tag_name = ? AND namespace = ?
-        """, (tag_name, namespace))
-        
-        row = cursor.fetchone()
-        conn.close()
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("""
+                SELECT tag_name, namespace, snapshot_id, created_at, metadata
+                FROM tags 
+                WHERE tag_name = ? AND namespace = ?
+            """, (tag_name, namespace))
+            
+            row = cursor.fetchone()
         
         if not row:
             return None
         
         tag_name, namespace, snapshot_id, created_at, metadata_str = row
-        metadata = json.loads(metadata_str) if metadata_str else {}
+        metadata = _loads(metadata_str) if metadata_str else {}
         
         return {
             "tag_name": tag_name,
@@ -1032,32 +1329,31 @@ class MetadataStore:
         Returns:
             List of tag dictionaries
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        if namespace:
-            cursor.execute("""
-                SELECT tag_name, namespace, snapshot_id, created_at, metadata
-                FROM tags 
-                WHERE namespace = ?
-                ORDER BY created_at DESC 
-                LIMIT ?
-            """, (namespace, limit))
-        else:
-            cursor.execute("""
-                SELECT tag_name, namespace, snapshot_id, created_at, metadata
-                FROM tags 
-                ORDER BY created_at DESC 
-                LIMIT ?
-            """, (limit,))
-        
-        rows = cursor.fetchall()
-        conn.close()
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            
+            if namespace:
+                cursor.execute("""
+                    SELECT tag_name, namespace, snapshot_id, created_at, metadata
+                    FROM tags 
+                    WHERE namespace = ?
+                    ORDER BY created_at DESC 
+                    LIMIT ?
+                """, (namespace, limit))
+            else:
+                cursor.execute("""
+                    SELECT tag_name, namespace, snapshot_id, created_at, metadata
+                    FROM tags 
+                    ORDER BY created_at DESC 
+                    LIMIT ?
+                """, (limit,))
+            
+            rows = cursor.fetchall()
         
         tags = []
         for row in rows:
             tag_name, namespace, snapshot_id, created_at, metadata_str = row
-            metadata = json.loads(metadata_str) if metadata_str else {}
+            metadata = _loads(metadata_str) if metadata_str else {}
             
             tags.append({
                 "tag_name": tag_name,
@@ -1082,20 +1378,15 @@ class MetadataStore:
         Returns:
             True if successful, False otherwise
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute("""
-                DELETE FROM tags 
-                WHERE tag_name = ? AND namespace = ?
-            """, (tag_name, namespace))
-            
-            conn.commit()
-            conn.close()
-            return cursor.rowcount > 0
+        with self._connection(write=True) as conn:
+            cursor = conn.cursor()
             
-        except Exception as e:
-            conn.close()
-            print(f"Tag deletion failed: {e}")
-            return False
\ No newline at end of file
+            try:
+                cursor.execute(_SQL_DELETE_TAG, (tag_name, namespace))
+                
+                conn.commit()
+                return cursor.rowcount > 0
+                
+            except Exception as e:
+                print(f"Tag deletion failed: {e}")
+                return False
\ No newline at end of file
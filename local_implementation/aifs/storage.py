@@ -5,16 +5,26 @@ Implements content-addressed storage using BLAKE3 hashing and AES-256-GCM encryp
 
 import os
 import json
+import mmap
 import pathlib
-import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import blake3
-from typing import Dict, List, Optional, Union, BinaryIO
+from typing import Dict, List, Optional, Tuple, Union, BinaryIO
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from .compression import CompressionService
 from .kms import KMS, KMSKey
 
+# Payloads at least this large are hashed with BLAKE3's multithreaded tree mode;
+# below it the thread fan-out costs more than it saves.
+PARALLEL_HASH_THRESHOLD = 128 * 1024
+
+# Read size used when spooling file-like sources to disk
+STREAM_CHUNK_SIZE = 1 << 20
+
 
 class StorageBackend:
     """Content-addressed storage backend for AIFS.
@@ -25,7 +35,7 @@ class StorageBackend:
     
     def __init__(self, root_dir: Union[str, pathlib.Path], encryption_key: Optional[bytes] = None,
                  kms_key_id: Optional[str] = None, compression_level: int = 1,
-                 kms: Optional[KMS] = None):
+                 kms: Optional[KMS] = None, hash_threads: Optional[int] = None):
         """Initialize the storage backend.
         
         Args:
@@ -34,6 +44,7 @@ class StorageBackend:
             kms_key_id: Optional KMS key ID for envelope encryption
             compression_level: zstd compression level (1-22, default 1 as per spec)
             kms: Optional KMS instance for envelope encryption
+            hash_threads: Threads for hashing large payloads (None = one per core, 1 = single-threaded)
         """
         self.root_dir = pathlib.Path(root_dir)
         self.root_dir.mkdir(parents=True, exist_ok=True)
@@ -55,6 +66,9 @@ class StorageBackend:
         # Initialize compression service
         self.compression_service = CompressionService(compression_level)
         
+        # BLAKE3 thread count for large payloads
+        self.hash_threads = blake3.blake3.AUTO if hash_threads is None else hash_threads
+        
         # Create storage subdirectories
         self.chunks_dir = self.root_dir / "chunks"
         self.chunks_dir.mkdir(exist_ok=True)
@@ -71,30 +85,173 @@ class StorageBackend:
         # Use first 4 chars as directory to avoid too many files in one dir
         return self.chunks_dir / hash_hex[:4] / hash_hex
     
-    def put(self, data: bytes) -> str:
+    def hash(self, data: Union[bytes, bytearray, memoryview]) -> str:
+        """Compute the content hash of data without storing it.
+        
+        Args:
+            data: Binary data (any flat bytes-like buffer)
+            
+        Returns:
+            Hex-encoded BLAKE3 hash of the data
+        """
+        if len(data) >= PARALLEL_HASH_THRESHOLD and self.hash_threads != 1:
+            return blake3.blake3(data, max_threads=self.hash_threads).hexdigest()
+        return blake3.blake3(data).hexdigest()
+    
+    def put(self, data: Union[bytes, bytearray, memoryview],
+            compression_level: Optional[int] = None) -> str:
         """Store data and return its content hash.
         
+        Data that is already stored is only hashed; it is not compressed,
+        encrypted or written again.
+        
         Args:
-            data: Binary data to store
+            data: Binary data to store; any flat bytes-like buffer is hashed and
+                  compressed in place without being copied into bytes
+            compression_level: Optional zstd level for this payload (defaults to the backend level)
             
         Returns:
             Hex-encoded BLAKE3 hash of the data
         """
         # Compute BLAKE3 hash of original data (before compression)
-        hash_hex = blake3.blake3(data).hexdigest()
+        hash_hex = self.hash(data)
+        self._write_chunk(hash_hex, data, compression_level)
+        return hash_hex
+    
+    def put_many(self, items: List[bytes], max_workers: Optional[int] = None,
+                 compression_levels: Optional[List[Optional[int]]] = None) -> List[str]:
+        """Store several payloads, hashing and writing them concurrently.
+        
+        BLAKE3, zstd and AES-GCM release the GIL, so the hashes are computed on
+        a thread pool and each distinct chunk is then compressed, encrypted and
+        written on the same pool.
+        
+        Args:
+            items: Binary payloads to store
+            max_workers: Optional thread pool size (defaults to the executor's choice)
+            compression_levels: Optional zstd level for each item (None entries use the backend level)
+            
+        Returns:
+            Hex-encoded BLAKE3 hashes, in the same order as items
+        """
+        levels = compression_levels or [None] * len(items)
+        if len(items) <= 1:
+            hashes = [self.hash(data) for data in items]
+            for hash_hex, data, level in zip(hashes, items, levels):
+                self._write_chunk(hash_hex, data, level)
+            return hashes
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            hashes = list(pool.map(self.hash, items))
+            
+            # Write each distinct chunk once; list() re-raises any write error
+            unique = dict(zip(hashes, zip(items, levels)))
+            list(pool.map(lambda hash_hex, item: self._write_chunk(hash_hex, *item),
+                          unique.keys(), unique.values()))
+        return hashes
+    
+    def put_file(self, source: Union[str, pathlib.Path, BinaryIO],
+                 compression_level: Optional[int] = None) -> Tuple[str, int]:
+        """Store the contents of a file without first reading it into a bytes object.
+        
+        Paths are hashed and compressed straight from a memory map. File-like
+        objects are hashed in chunks as they are spooled to a temporary file. If
+        the content is already stored, nothing beyond the hash is read.
+        
+        Args:
+            source: Path to a file, or a binary file-like object
+            compression_level: Optional zstd level for this payload (defaults to the backend level)
+            
+        Returns:
+            Tuple of (hex-encoded BLAKE3 hash, size in bytes)
+        """
+        if hasattr(source, "read"):
+            return self._put_stream(source, compression_level)
         
-        # Create path with parent directories
+        path = pathlib.Path(source)
+        size = path.stat().st_size
+        if size == 0:
+            # Empty files cannot be memory-mapped
+            return self.put(b""), 0
+        
+        hash_hex = blake3.blake3(max_threads=self.hash_threads).update_mmap(path).hexdigest()
+        self._write_file_chunk(hash_hex, path, compression_level)
+        return hash_hex, size
+    
+    def _put_stream(self, source: BinaryIO, compression_level: Optional[int] = None) -> Tuple[str, int]:
+        """Store a file-like object, hashing it while it is spooled to disk.
+        
+        The spool file is only read back if the content is not already stored.
+        Hashing and spooling are streamed, but compression and the AES-GCM
+        envelope still work on the whole payload in memory.
+        
+        Args:
+            source: Binary file-like object
+            compression_level: Optional zstd level (defaults to the backend level)
+            
+        Returns:
+            Tuple of (hex-encoded BLAKE3 hash, size in bytes)
+        """
+        # Full reads of STREAM_CHUNK_SIZE exceed PARALLEL_HASH_THRESHOLD and can use
+        # several threads; the final read and any short read are hashed the same way
+        # but may be too small to gain from it
+        hasher = blake3.blake3(max_threads=self.hash_threads)
+        size = 0
+        tmp = tempfile.NamedTemporaryFile(dir=self.root_dir, delete=False)
+        try:
+            with tmp:
+                for chunk in iter(lambda: source.read(STREAM_CHUNK_SIZE), b""):
+                    hasher.update(chunk)
+                    tmp.write(chunk)
+                    size += len(chunk)
+            hash_hex = hasher.hexdigest()
+            if size == 0:
+                # Empty files cannot be memory-mapped
+                self._write_chunk(hash_hex, b"")
+            else:
+                self._write_file_chunk(hash_hex, tmp.name, compression_level)
+            return hash_hex, size
+        finally:
+            os.unlink(tmp.name)
+    
+    def _write_file_chunk(self, hash_hex: str, path: Union[str, pathlib.Path],
+                          compression_level: Optional[int] = None) -> None:
+        """Store a non-empty file's contents from a memory map unless already stored.
+        
+        Args:
+            hash_hex: BLAKE3 hash of the file contents
+            path: File to store
+            compression_level: Optional zstd level (defaults to the backend level)
+        """
+        if not self._hash_to_path(hash_hex).exists():
+            with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                self._write_chunk(hash_hex, mm, compression_level)
+    
+    def _write_chunk(self, hash_hex: str, data, compression_level: Optional[int] = None) -> None:
+        """Compress, encrypt and write a chunk unless it is already stored.
+        
+        Args:
+            hash_hex: BLAKE3 hash of the data
+            data: Raw data (bytes or any buffer, e.g. an mmap)
+            compression_level: Optional zstd level (defaults to the backend level)
+        """
         path = self._hash_to_path(hash_hex)
-        path.parent.mkdir(parents=True, exist_ok=True)
         
         # Only write if doesn't exist (content-addressed, so same hash = same content)
         if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            
             # Compress data with zstd
-            compressed_data = self.compression_service.compress(data)
+            compressed_data = self.compression_service.compress(data, compression_level)
             
             # Encrypt compressed data with AES-256-GCM
             encrypted_data = self._encrypt_chunk(compressed_data)
-            path.write_bytes(encrypted_data)
+            
+            # Write to a temporary file and rename it into place, so a concurrent
+            # writer of the same chunk never leaves a torn file behind
+            tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(encrypted_data)
+            os.replace(tmp_path, path)
             
             # Store KMS key ID in metadata file
             metadata_path = path.with_suffix('.meta')
@@ -102,8 +259,6 @@ class StorageBackend:
                 f.write(f"kms_key_id={self.kms_key_id}\n")
                 f.write(f"encryption=AES-256-GCM\n")
                 f.write(f"hash_algorithm=BLAKE3\n")
-        
-        return hash_hex
     
     def _encrypt_chunk(self, data: bytes) -> bytes:
         """Encrypt a chunk of data using AES-256-GCM with KMS envelope encryption.
@@ -232,6 +387,24 @@ class StorageBackend:
                 return compressed_data
         return None
     
+    def get_many(self, hashes: List[str], max_workers: Optional[int] = None) -> Dict[str, bytes]:
+        """Retrieve several payloads, reading and decompressing them concurrently.
+        
+        Args:
+            hashes: Hex-encoded BLAKE3 hashes
+            max_workers: Optional thread pool size (defaults to the executor's choice)
+            
+        Returns:
+            Dictionary mapping hash to data; hashes that are not found are omitted
+        """
+        unique = list(dict.fromkeys(hashes))
+        if len(unique) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                found = zip(unique, pool.map(self.get, unique))
+        else:
+            found = ((hash_hex, self.get(hash_hex)) for hash_hex in unique)
+        return {hash_hex: data for hash_hex, data in found if data is not None}
+    
     def exists(self, hash_hex: str) -> bool:
         """Check if data with given hash exists.
         
@@ -5,15 +5,27 @@ Implements atomic transactions and strong causality guarantees as specified in t
 Ensures that "Asset B SHALL NOT be visible until A is fully committed" when B lists A as a parent.
 """
 
+import json
+import queue
 import sqlite3
 import threading
 import time
 import uuid
-from typing import Dict, List, Optional, Set, Any
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, Iterable, List, Optional, Set, Any, Tuple
 from dataclasses import dataclass
 from enum import Enum
 from contextlib import contextmanager
 
+from .metadata import split_parents
+
+# Number of asset IDs known to be visible that are remembered per manager
+VISIBILITY_CACHE_SIZE = 65536
+
+# Maximum number of asset IDs bound into a single IN (...) query
+_MAX_IN_PARAMS = 500
+
 
 class TransactionState(Enum):
     """Transaction state enumeration."""
@@ -49,6 +61,15 @@ class TransactionManager:
         self._lock = threading.RLock()
         self._active_transactions: Dict[str, Transaction] = {}
         self._asset_transactions: Dict[str, str] = {}  # asset_id -> transaction_id
+        
+        # Assets known to be visible (LRU). Only commits make assets visible and
+        # only rollbacks hide them, and both update this cache
+        self._visible_cache: "OrderedDict[str, None]" = OrderedDict()
+        
+        # Group commit: committers queue their transaction and whichever holds
+        # the commit lock writes everything queued with a single SQLite commit
+        self._commit_queue: "queue.SimpleQueue[Tuple[Transaction, Future]]" = queue.SimpleQueue()
+        self._commit_lock = threading.Lock()
         self._init_db()
     
     def _init_db(self):
@@ -169,12 +190,12 @@ class TransactionManager:
             
             return True
     
-    def add_dependency(self, transaction_id: str, parent_asset_id: str) -> bool:
-        """Add a dependency to a transaction.
+    def add_assets_to_transaction(self, transaction_id: str, asset_ids: List[str]) -> bool:
+        """Add several assets to a transaction with a single database write.
         
         Args:
             transaction_id: Transaction ID
-            parent_asset_id: Parent asset ID
+            asset_ids: Asset IDs
             
         Returns:
             True if successful, False otherwise
@@ -187,65 +208,111 @@ class TransactionManager:
             if transaction.state != TransactionState.PENDING:
                 return False
             
-            transaction.dependencies.add(parent_asset_id)
+            transaction.assets.update(asset_ids)
+            for asset_id in asset_ids:
+                self._asset_transactions[asset_id] = transaction_id
             
-            # Store in database
             conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT OR REPLACE INTO transaction_dependencies (transaction_id, parent_asset_id) VALUES (?, ?)",
-                (transaction_id, parent_asset_id)
-            )
-            conn.commit()
-            conn.close()
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO transaction_assets (transaction_id, asset_id) VALUES (?, ?)",
+                    [(transaction_id, asset_id) for asset_id in asset_ids]
+                )
+                conn.commit()
+            finally:
+                conn.close()
             
             return True
     
-    def check_dependencies_committed(self, transaction_id: str) -> bool:
-        """Check if all dependencies are committed.
+    def add_dependencies(self, transaction_id: str, parent_asset_ids: List[str]) -> bool:
+        """Add several dependencies to a transaction with a single database write.
         
         Args:
             transaction_id: Transaction ID
+            parent_asset_ids: Parent asset IDs
             
         Returns:
-            True if all dependencies are committed, False otherwise
+            True if successful, False otherwise
         """
         with self._lock:
             if transaction_id not in self._active_transactions:
                 return False
             
             transaction = self._active_transactions[transaction_id]
+            if transaction.state != TransactionState.PENDING:
+                return False
             
-            # If no dependencies, return True
-            if not transaction.dependencies:
-                return True
+            transaction.dependencies.update(parent_asset_ids)
             
             conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            for parent_asset_id in transaction.dependencies:
-                # Check if the parent asset is in the same transaction
-                if parent_asset_id in transaction.assets:
-                    # Parent is in the same transaction, so it's considered "committed" for this transaction
-                    continue
-                
-                # Check if the parent asset is visible (committed in another transaction)
-                cursor.execute(
-                    "SELECT visible FROM asset_visibility WHERE asset_id = ?",
-                    (parent_asset_id,)
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO transaction_dependencies (transaction_id, parent_asset_id) VALUES (?, ?)",
+                    [(transaction_id, parent_asset_id) for parent_asset_id in parent_asset_ids]
                 )
-                result = cursor.fetchone()
-                
-                if not result or not result[0]:
-                    conn.close()
-                    return False
+                conn.commit()
+            finally:
+                conn.close()
             
-            conn.close()
             return True
     
+    def add_dependency(self, transaction_id: str, parent_asset_id: str) -> bool:
+        """Add a dependency to a transaction.
+        
+        Args:
+            transaction_id: Transaction ID
+            parent_asset_id: Parent asset ID
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        return self.add_dependencies(transaction_id, [parent_asset_id])
+    
+    def check_dependencies_committed(self, transaction_id: str) -> bool:
+        """Check if all dependencies are committed.
+        
+        Args:
+            transaction_id: Transaction ID
+            
+        Returns:
+            True if all dependencies are committed, False otherwise
+        """
+        with self._lock:
+            if transaction_id not in self._active_transactions:
+                return False
+            
+            transaction = self._active_transactions[transaction_id]
+            
+            # A parent in the same transaction is "committed" for this transaction;
+            # every other parent must already be visible
+            outside = [parent for parent in transaction.dependencies if parent not in transaction.assets]
+            return len(self.get_visible_assets_subset(outside)) == len(outside)
+    
+    def get_commit_diagnostics(self, transaction_id: str) -> Dict[str, Any]:
+        """Describe why a transaction may have failed to commit.
+        
+        Active transactions keep their state in memory, so this costs at most
+        one query.
+        
+        Args:
+            transaction_id: Transaction ID
+            
+        Returns:
+            Dictionary with the transaction "state" and whether its
+            "dependencies_committed"
+        """
+        with self._lock:
+            return {
+                "state": self.get_transaction_state(transaction_id),
+                "dependencies_committed": self.check_dependencies_committed(transaction_id),
+            }
+    
     def commit_transaction(self, transaction_id: str) -> bool:
         """Commit a transaction and make assets visible.
         
+        Concurrent commits are combined: every transaction queued while another
+        thread is writing is made durable by that thread's next single commit.
+        
         Args:
             transaction_id: Transaction ID
             
@@ -257,6 +324,8 @@ class TransactionManager:
                 return False
             
             transaction = self._active_transactions[transaction_id]
+            if transaction.state == TransactionState.COMMITTING:
+                return False
             
             # Check if all dependencies are committed
             if not self.check_dependencies_committed(transaction_id):
@@ -264,51 +333,74 @@ class TransactionManager:
             
             # Update transaction state
             transaction.state = TransactionState.COMMITTING
-            
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
+        
+        done = Future()
+        self._commit_queue.put((transaction, done))
+        with self._commit_lock:
+            # A previous lock holder may already have written this transaction
+            if not done.done():
+                self._flush_commits()
+        return done.result()
+    
+    def _flush_commits(self) -> None:
+        """Write every queued commit in one SQLite transaction and report the outcome.
+        
+        Must be called with the commit lock held.
+        """
+        batch = []
+        while True:
             try:
-                # Update transaction state
-                cursor.execute(
+                batch.append(self._commit_queue.get_nowait())
+            except queue.Empty:
+                break
+        
+        committed_at = time.time()
+        success = False
+        try:
+            conn = None
+            try:
+                conn = sqlite3.connect(self.db_path)
+                conn.executemany(
                     "UPDATE transactions SET state = ?, committed_at = ? WHERE transaction_id = ?",
-                    (TransactionState.COMMITTING.value, time.time(), transaction_id)
+                    [(TransactionState.COMMITTED.value, committed_at, transaction.transaction_id)
+                     for transaction, _ in batch]
                 )
                 
                 # Make all assets visible
-                for asset_id in transaction.assets:
-                    cursor.execute(
-                        "INSERT OR REPLACE INTO asset_visibility (asset_id, visible, transaction_id, committed_at) "
-                        "VALUES (?, ?, ?, ?)",
-                        (asset_id, True, transaction_id, time.time())
-                    )
-                
-                # Update transaction state to committed
-                cursor.execute(
-                    "UPDATE transactions SET state = ? WHERE transaction_id = ?",
-                    (TransactionState.COMMITTED.value, transaction_id)
+                conn.executemany(
+                    "INSERT OR REPLACE INTO asset_visibility (asset_id, visible, transaction_id, committed_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    [(asset_id, True, transaction.transaction_id, committed_at)
+                     for transaction, _ in batch for asset_id in transaction.assets]
                 )
                 
                 conn.commit()
-                
-                # Update in-memory state
-                transaction.state = TransactionState.COMMITTED
-                
-                # Clean up
-                for asset_id in transaction.assets:
-                    if asset_id in self._asset_transactions:
-                        del self._asset_transactions[asset_id]
-                
-                del self._active_transactions[transaction_id]
-                
-                return True
-                
-            except Exception as e:
-                conn.rollback()
-                transaction.state = TransactionState.FAILED
-                return False
+                success = True
+            except Exception:
+                if conn is not None:
+                    conn.rollback()
             finally:
-                conn.close()
+                if conn is not None:
+                    conn.close()
+            
+            # Update in-memory state
+            with self._lock:
+                for transaction, _ in batch:
+                    if not success:
+                        transaction.state = TransactionState.FAILED
+                        continue
+                    
+                    transaction.state = TransactionState.COMMITTED
+                    self._remember_visible(transaction.assets)
+                    
+                    # Clean up
+                    for asset_id in transaction.assets:
+                        self._asset_transactions.pop(asset_id, None)
+                    self._active_transactions.pop(transaction.transaction_id, None)
+        finally:
+            # Every drained commit is waiting on its future; never leave one unresolved
+            for _, done in batch:
+                done.set_result(success)
     
     def rollback_transaction(self, transaction_id: str) -> bool:
         """Rollback a transaction.
@@ -324,6 +416,8 @@ class TransactionManager:
                 return False
             
             transaction = self._active_transactions[transaction_id]
+            if transaction.state == TransactionState.COMMITTING:
+                return False
             transaction.state = TransactionState.ROLLING_BACK
             
             conn = sqlite3.connect(self.db_path)
@@ -347,6 +441,8 @@ class TransactionManager:
                 
                 # Update in-memory state
                 transaction.state = TransactionState.ROLLED_BACK
+                for asset_id in transaction.assets:
+                    self._visible_cache.pop(asset_id, None)
                 
                 # Clean up
                 for asset_id in transaction.assets:
@@ -374,6 +470,10 @@ class TransactionManager:
             True if asset is visible, False otherwise
         """
         with self._lock:
+            if asset_id in self._visible_cache:
+                self._visible_cache.move_to_end(asset_id)
+                return True
+            
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
             
@@ -385,7 +485,61 @@ class TransactionManager:
             
             conn.close()
             
-            return result is not None and bool(result[0])
+            visible = result is not None and bool(result[0])
+            if visible:
+                self._remember_visible((asset_id,))
+            return visible
+    
+    def get_visible_assets_subset(self, asset_ids: List[str]) -> Set[str]:
+        """Return which of the given assets are visible.
+        
+        Assets already known to be visible are answered from the cache; the
+        rest are checked with one IN query per 500 IDs.
+        
+        Args:
+            asset_ids: Asset IDs to check
+            
+        Returns:
+            Set of visible asset IDs
+        """
+        if not asset_ids:
+            return set()
+        
+        with self._lock:
+            visible = {asset_id for asset_id in asset_ids if asset_id in self._visible_cache}
+            unknown = list({asset_id for asset_id in asset_ids if asset_id not in visible})
+            if not unknown:
+                return visible
+            
+            found = set()
+            conn = sqlite3.connect(self.db_path)
+            try:
+                for start in range(0, len(unknown), _MAX_IN_PARAMS):
+                    chunk = unknown[start:start + _MAX_IN_PARAMS]
+                    placeholders = ",".join("?" * len(chunk))
+                    cursor = conn.execute(
+                        f"SELECT asset_id FROM asset_visibility WHERE visible = 1 AND asset_id IN ({placeholders})",
+                        chunk
+                    )
+                    found.update(row[0] for row in cursor)
+            finally:
+                conn.close()
+            
+            self._remember_visible(found)
+            return visible | found
+    
+    def _remember_visible(self, asset_ids: Iterable[str]) -> None:
+        """Record assets as visible in the bounded cache (caller holds the lock).
+        
+        Args:
+            asset_ids: Asset IDs that are now visible
+        """
+        cache = self._visible_cache
+        for asset_id in asset_ids:
+            cache[asset_id] = None
+            cache.move_to_end(asset_id)
+        while len(cache) > VISIBILITY_CACHE_SIZE:
+            cache.popitem(last=False)
     
     def get_asset_transaction(self, asset_id: str) -> Optional[str]:
         """Get the transaction ID for an asset.
@@ -523,14 +677,14 @@ class StrongCausalityManager:
         if transaction_id is None:
             transaction_id = self.transaction_manager.begin_transaction()
         
+        parent_ids, transform_names, transform_digests = split_parents(parents)
+        
         # Add asset to transaction
         self.transaction_manager.add_asset_to_transaction(transaction_id, asset_id)
         
         # Add dependencies
-        if parents:
-            for parent in parents:
-                parent_id = parent["asset_id"]
-                self.transaction_manager.add_dependency(transaction_id, parent_id)
+        if parent_ids:
+            self.transaction_manager.add_dependencies(transaction_id, list(parent_ids))
         
         # Store asset metadata (but not visible yet)
         self.metadata_store.add_asset(
@@ -541,14 +695,8 @@ class StrongCausalityManager:
         )
         
         # Add lineage information
-        if parents:
-            for parent in parents:
-                self.metadata_store.add_lineage(
-                    child_id=asset_id,
-                    parent_id=parent["asset_id"],
-                    transform_name=parent.get("transform_name"),
-                    transform_digest=parent.get("transform_digest")
-                )
+        if parent_ids:
+            self.metadata_store.add_lineage_batch(asset_id, parent_ids, transform_names, transform_digests)
         
         return transaction_id
     
@@ -615,7 +763,7 @@ class StrongCausalityManager:
         assets = []
         for row in metadata_cursor.fetchall():
             asset_id, kind, size, metadata_str, created_at = row
-            metadata = eval(metadata_str) if metadata_str else {}
+            metadata = json.loads(metadata_str) if metadata_str else {}
             
             assets.append({
                 "asset_id": asset_id,
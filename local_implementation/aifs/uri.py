@@ -9,6 +9,10 @@ import re
 from typing import Optional, Tuple
 from urllib.parse import urlparse
 
+# Canonical URI prefixes
+ASSET_URI_PREFIX = "aifs://"
+SNAPSHOT_URI_PREFIX = "aifs-snap://"
+
 
 class AIFSUri:
     """AIFS URI parser and generator."""
@@ -26,7 +30,14 @@ class AIFSUri:
         Returns:
             True if valid BLAKE3 hash, False otherwise
         """
-        return bool(AIFSUri.BLAKE3_PATTERN.match(hash_str))
+        # Round-tripping through bytes.fromhex is done in C and, unlike the
+        # regex, rejects uppercase digits and a trailing newline
+        if len(hash_str) != 64:
+            return False
+        try:
+            return bytes.fromhex(hash_str).hex() == hash_str
+        except ValueError:
+            return False
     
     @staticmethod
     def asset_id_to_uri(asset_id: str) -> str:
@@ -44,7 +55,7 @@ class AIFSUri:
         if not AIFSUri.is_valid_blake3_hash(asset_id):
             raise ValueError(f"Invalid BLAKE3 hash: {asset_id}")
         
-        return f"aifs://{asset_id}"
+        return ASSET_URI_PREFIX + asset_id
     
     @staticmethod
     def snapshot_id_to_uri(snapshot_id: str) -> str:
@@ -62,7 +73,7 @@ class AIFSUri:
         if not AIFSUri.is_valid_blake3_hash(snapshot_id):
             raise ValueError(f"Invalid BLAKE3 hash: {snapshot_id}")
         
-        return f"aifs-snap://{snapshot_id}"
+        return SNAPSHOT_URI_PREFIX + snapshot_id
     
     @staticmethod
     def parse_asset_uri(uri: str) -> Optional[str]:
@@ -75,6 +86,12 @@ class AIFSUri:
             Asset ID (BLAKE3 hash) or None if invalid
         """
         try:
+            # Canonical URIs are sliced directly; other spellings go through urlparse
+            if uri.startswith(ASSET_URI_PREFIX):
+                asset_id = uri[len(ASSET_URI_PREFIX):]
+                if AIFSUri.is_valid_blake3_hash(asset_id):
+                    return asset_id
+            
             parsed = urlparse(uri)
             if parsed.scheme != 'aifs':
                 return None
@@ -104,6 +121,12 @@ class AIFSUri:
             Snapshot ID (BLAKE3 hash) or None if invalid
         """
         try:
+            # Canonical URIs are sliced directly; other spellings go through urlparse
+            if uri.startswith(SNAPSHOT_URI_PREFIX):
+                snapshot_id = uri[len(SNAPSHOT_URI_PREFIX):]
+                if AIFSUri.is_valid_blake3_hash(snapshot_id):
+                    return snapshot_id
+            
             parsed = urlparse(uri)
             if parsed.scheme != 'aifs-snap':
                 return None
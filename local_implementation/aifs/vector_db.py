@@ -139,6 +139,34 @@ class VectorDB:
         else:
             self._add_sklearn(asset_id, embedding)
     
+    def add_many(self, asset_ids: List[str], embeddings: np.ndarray):
+        """Add embeddings for several assets and save the index once.
+        
+        Args:
+            asset_ids: Asset IDs (BLAKE3 hashes)
+            embeddings: Array of shape (len(asset_ids), dimension)
+        """
+        if len(asset_ids) == 0:
+            return
+        if embeddings.shape != (len(asset_ids), self.dimension):
+            raise ValueError(f"Embeddings must have shape ({len(asset_ids)}, {self.dimension})")
+        
+        if self.faiss_available:
+            first_id = self.index.ntotal
+            self.index.add(np.ascontiguousarray(embeddings, dtype=np.float32))
+            for offset, asset_id in enumerate(asset_ids):
+                self.id_to_asset[first_id + offset] = asset_id
+        else:
+            for asset_id, embedding in zip(asset_ids, embeddings):
+                self.embeddings.append(embedding)
+                self.asset_ids.append(asset_id)
+                self.id_to_asset[len(self.embeddings) - 1] = asset_id
+            if len(self.embeddings) > 1:
+                self._rebuild_sklearn_index()
+        
+        # Save changes
+        self._save_index()
+    
     def _add_faiss(self, asset_id: str, embedding: np.ndarray):
         """Add embedding to FAISS index."""
         # Add to index
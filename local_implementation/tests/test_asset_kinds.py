@@ -100,6 +100,7 @@ class TestTensorAsset(unittest.TestCase):
         )
         
         encoded = SimpleAssetKindEncoder.encode_tensor(tensor_data)
+        self.assertIsInstance(encoded, bytes)
         decoded = SimpleAssetKindEncoder.decode_tensor(encoded)
         
         self.assertEqual(decoded.dtype, tensor_data.dtype)
@@ -147,6 +148,30 @@ class TestTensorAsset(unittest.TestCase):
                 self.assertEqual(decoded.shape, shape)
                 np.testing.assert_array_equal(decoded.data, array)
     
+    def test_tensor_non_contiguous_and_buffer_input(self):
+        """Test encoding a strided tensor and decoding from a memoryview."""
+        array = np.arange(24, dtype=np.int32).reshape(4, 6)[:, ::2]
+        tensor_data = TensorData(data=array, dtype='int32', shape=array.shape)
+        
+        encoded = SimpleAssetKindEncoder.encode_tensor(tensor_data)
+        decoded = SimpleAssetKindEncoder.decode_tensor(memoryview(encoded))
+        
+        np.testing.assert_array_equal(decoded.data, array)
+        self.assertTrue(SimpleAssetKindValidator.validate_tensor(memoryview(encoded)))
+    
+    def test_tensor_encode_into_reused_buffer(self):
+        """Test encoding into a reusable buffer matches encode_tensor."""
+        buffer = bytearray(16)
+        for size in (100, 3):
+            array = np.arange(size, dtype=np.float64)
+            tensor_data = TensorData(data=array, dtype='float64', shape=array.shape)
+            
+            with SimpleAssetKindEncoder.encode_tensor_into(tensor_data, buffer) as encoded:
+                self.assertEqual(bytes(encoded), bytes(SimpleAssetKindEncoder.encode_tensor(tensor_data)))
+        
+        # Grown for the larger tensor and not shrunk for the smaller one
+        self.assertGreater(len(buffer), 800)
+    
     def test_tensor_validation(self):
         """Test tensor validation."""
         # Valid tensor
@@ -484,6 +509,18 @@ class TestAssetManagerIntegration(unittest.TestCase):
         np.testing.assert_array_equal(retrieved.data, array)
         self.assertEqual(retrieved.metadata['name'], 'test_tensor')
     
+    def test_tensor_asset_manager_reuses_buffer(self):
+        """Test that consecutive put_tensor calls do not corrupt each other."""
+        arrays = [np.full((4, 4), i, dtype=np.int64) for i in range(3)]
+        asset_ids = [
+            self.asset_manager.put_tensor(TensorData(data=array, dtype='int64', shape=array.shape))
+            for array in arrays
+        ]
+        
+        self.assertEqual(len(set(asset_ids)), 3)
+        for asset_id, array in zip(asset_ids, arrays):
+            np.testing.assert_array_equal(self.asset_manager.get_tensor(asset_id).data, array)
+    
     def test_embedding_asset_manager_integration(self):
         """Test embedding integration with AssetManager."""
         vector = np.random.rand(64).astype(np.float32)
@@ -503,6 +540,27 @@ class TestAssetManagerIntegration(unittest.TestCase):
         np.testing.assert_array_almost_equal(retrieved.vector, vector)
         self.assertEqual(retrieved.model, 'custom')
     
+    def test_embeddings_bulk_asset_manager_integration(self):
+        """Test storing and indexing several embeddings at once."""
+        vectors = np.random.rand(3, 128).astype(np.float32)
+        embedding_datas = [
+            EmbeddingData(vector=vector, model='custom', dimension=len(vector), distance_metric='cosine')
+            for vector in vectors
+        ]
+        
+        asset_ids = self.asset_manager.put_embeddings_bulk(embedding_datas, metadata={'source': 'bulk'}, index=True)
+        
+        self.assertEqual(len(asset_ids), 3)
+        for asset_id, vector in zip(asset_ids, vectors):
+            np.testing.assert_array_almost_equal(self.asset_manager.get_embedding(asset_id).vector, vector)
+        self.assertEqual(self.asset_manager.get_asset(asset_ids[0])['metadata']['source'], 'bulk')
+        self.assertEqual(self.asset_manager.vector_search(vectors[1], k=1)[0]['asset_id'], asset_ids[1])
+        
+        with self.assertRaises(ValueError):
+            self.asset_manager.put_embeddings_bulk([
+                EmbeddingData(vector=np.zeros(4, dtype=np.float32), model='custom', dimension=4)
+            ], index=True)
+    
     def test_artifact_asset_manager_integration(self):
         """Test artifact integration with AssetManager."""
         files = {'test.txt': b'Hello, artifact!'}
@@ -4,7 +4,10 @@
 import unittest
 import tempfile
 import os
+import threading
 from pathlib import Path
+from unittest import mock
+import blake3
 import numpy as np
 
 # Import AIFS components
@@ -140,6 +143,212 @@ class TestAssetManager(unittest.TestCase):
             self.assertIn("asset_id", result)
             self.assertIn("kind", result)
 
+    def test_vector_search_metadata_only(self):
+        """Test that vector search returns metadata without loading data by default."""
+        embeddings = [np.random.rand(128).astype(np.float32) for _ in range(3)]
+        asset_ids = [
+            self.asset_manager.put_asset(f"Blob {i}".encode(), kind="blob",
+                                         embedding=embedding, metadata={"i": i})
+            for i, embedding in enumerate(embeddings)
+        ]
+        
+        results = self.asset_manager.vector_search(embeddings[0], k=3)
+        
+        self.assertEqual({r["asset_id"] for r in results}, set(asset_ids))
+        self.assertEqual(results[0]["asset_id"], asset_ids[0])
+        for result in results:
+            self.assertIn("score", result)
+            self.assertNotIn("data", result)
+        
+        full = self.asset_manager.vector_search(embeddings[0], k=1, include_data=True)
+        self.assertEqual(full[0]["data"], b"Blob 0")
+
+    def test_embedding_indexed_in_background(self):
+        """Test that put_asset does not wait for the vector index but search does."""
+        release = threading.Event()
+        add = self.asset_manager.vector_db.add
+        
+        def slow_add(*args):
+            release.wait(5)
+            add(*args)
+        
+        embedding = np.random.rand(128).astype(np.float32)
+        with mock.patch.object(self.asset_manager.vector_db, "add", side_effect=slow_add):
+            asset_id = self.asset_manager.put_asset(b"Background embedding", embedding=embedding)
+            self.assertTrue(self.asset_manager._pending_vectors)
+            release.set()
+            results = self.asset_manager.vector_search(embedding, k=1)
+        
+        self.assertEqual(results[0]["asset_id"], asset_id)
+        self.assertFalse(self.asset_manager._pending_vectors)
+
+    def test_failed_background_index_is_reported(self):
+        """Test that a failed background insert surfaces from the next search and can be redone."""
+        embedding = np.random.rand(128).astype(np.float32)
+        with mock.patch.object(self.asset_manager.vector_db, "add", side_effect=RuntimeError("index full")):
+            asset_id = self.asset_manager.put_asset(b"Unindexed embedding", embedding=embedding)
+            with self.assertRaisesRegex(RuntimeError, asset_id):
+                self.asset_manager.vector_search(embedding, k=1)
+        
+        # Reported once; storing the asset again re-indexes it
+        self.assertEqual(self.asset_manager.vector_search(embedding, k=1), [])
+        self.asset_manager.put_asset(b"Unindexed embedding", embedding=embedding)
+        self.assertEqual(self.asset_manager.vector_search(embedding, k=1)[0]["asset_id"], asset_id)
+
+    def test_vector_search_include_data_matches_get_asset(self):
+        """Test that hydrated search hits match get_asset plus a score."""
+        embeddings = [np.random.rand(128).astype(np.float32) for _ in range(3)]
+        parent_id = self.asset_manager.put_asset(b"Parent", kind="blob", embedding=embeddings[0])
+        child_id = self.asset_manager.put_asset(
+            b"Child", kind="blob", embedding=embeddings[1],
+            parents=[{"asset_id": parent_id, "transform_name": "derive"}]
+        )
+        self.asset_manager.put_asset(b"Other", kind="blob", embedding=embeddings[2])
+        
+        results = self.asset_manager.vector_search(embeddings[1], k=3, include_data=True)
+        
+        self.assertEqual(results[0]["asset_id"], child_id)
+        for result in results:
+            expected = self.asset_manager.get_asset(result["asset_id"])
+            self.assertEqual({k: v for k, v in result.items() if k != "score"}, expected)
+        self.assertEqual(results[0]["parents"][0]["asset_id"], parent_id)
+
+    def test_put_asset_from_file(self):
+        """Test streaming a blob asset from a path."""
+        source = Path(self.temp_dir.name) / "blob.bin"
+        source.write_bytes(b"Streamed blob data")
+        
+        asset_id = self.asset_manager.put_asset(source, kind="blob")
+        
+        self.assertEqual(asset_id, self.asset_manager.put_asset(b"Streamed blob data"))
+        asset = self.asset_manager.get_asset(asset_id)
+        self.assertEqual(asset["data"], b"Streamed blob data")
+        self.assertEqual(asset["size"], len(b"Streamed blob data"))
+
+    def test_put_asset_rejects_non_data(self):
+        """Test that strings and other non-data arguments are rejected, not opened as paths."""
+        source = Path(self.temp_dir.name) / "not-a-path.bin"
+        source.write_bytes(b"Local file contents")
+        
+        for data in ("hello", str(source), 123, None, ["list"]):
+            for kind in ("blob", "tensor"):
+                with self.subTest(data=data, kind=kind):
+                    with self.assertRaises(ValueError):
+                        self.asset_manager.put_asset(data, kind=kind)
+        
+        self.assertEqual(self.asset_manager.list_assets(), [])
+
+    def test_put_asset_from_buffer(self):
+        """Test that bytes-like buffers are stored as their raw bytes."""
+        array = np.arange(16, dtype=np.float32)
+        expected_id = self.asset_manager.put_asset(array.tobytes())
+        
+        self.assertEqual(self.asset_manager.put_asset(bytearray(array.tobytes())), expected_id)
+        self.assertEqual(self.asset_manager.put_asset(memoryview(array)), expected_id)
+        
+        asset = self.asset_manager.get_asset(expected_id)
+        self.assertEqual(asset["size"], array.nbytes)
+        self.assertEqual(asset["data"], array.tobytes())
+
+    def test_embedding_normalization(self):
+        """Test that embeddings are coerced to float32 and mis-shaped ones rejected."""
+        embedding = np.random.rand(1, 128)  # float64, row vector
+        asset_id = self.asset_manager.put_asset(b"Normalized", kind="blob", embedding=embedding)
+        
+        results = self.asset_manager.vector_search(embedding, k=1)
+        self.assertEqual(results[0]["asset_id"], asset_id)
+        
+        with self.assertRaises(ValueError):
+            self.asset_manager.put_asset(b"Wrong shape", kind="blob", embedding=np.zeros(64))
+        with self.assertRaises(ValueError):
+            self.asset_manager.vector_search(np.zeros(64))
+
+    def test_put_assets_batch(self):
+        """Test storing several assets, with in-batch lineage, at once."""
+        parent_data = b"Batch parent"
+        parent_id = blake3.blake3(parent_data).hexdigest()
+        embedding = np.random.rand(128).astype(np.float32)
+        
+        asset_ids = self.asset_manager.put_assets_batch([
+            {"data": parent_data, "metadata": {"role": "parent"}},
+            {"data": b"Batch child", "embedding": embedding,
+             "parents": [{"asset_id": parent_id, "transform_name": "derive"}]},
+        ])
+        
+        self.assertEqual(asset_ids[0], parent_id)
+        child = self.asset_manager.get_asset(asset_ids[1])
+        self.assertEqual(child["data"], b"Batch child")
+        self.assertEqual([p["asset_id"] for p in child["parents"]], [parent_id])
+        self.assertEqual(self.asset_manager.get_asset(parent_id)["metadata"], {"role": "parent"})
+        self.assertEqual(self.asset_manager.vector_search(embedding, k=1)[0]["asset_id"], asset_ids[1])
+        
+        self.assertEqual(self.asset_manager.put_assets_batch([]), [])
+
+    def test_put_assets_batch_in_transaction(self):
+        """Test that a batch added to an open transaction stays hidden until it commits."""
+        transaction_id = self.asset_manager.begin_transaction()
+        asset_ids = self.asset_manager.put_assets_batch(
+            [{"data": b"Pending 1"}, {"data": b"Pending 2"}], transaction_id=transaction_id
+        )
+        
+        self.assertIsNone(self.asset_manager.get_asset(asset_ids[0]))
+        self.assertTrue(self.asset_manager.commit_transaction(transaction_id))
+        for asset_id in asset_ids:
+            self.assertIsNotNone(self.asset_manager.get_asset(asset_id))
+
+    def test_lineage_hides_uncommitted_assets(self):
+        """Test that parents and children from open transactions are not listed."""
+        parent_id = self.asset_manager.put_asset(b"Committed parent")
+        transaction_id = self.asset_manager.begin_transaction()
+        child_id = self.asset_manager.put_asset(
+            b"Pending child", parents=[{"asset_id": parent_id}], transaction_id=transaction_id
+        )
+        
+        self.assertEqual(self.asset_manager.get_children(parent_id), [])
+        self.assertEqual([p["asset_id"] for p in self.asset_manager.get_parents(child_id)], [parent_id])
+        
+        self.assertTrue(self.asset_manager.commit_transaction(transaction_id))
+        self.assertEqual([c["asset_id"] for c in self.asset_manager.get_children(parent_id)], [child_id])
+
+    def test_put_assets_batch_validates_first(self):
+        """Test that an invalid item rejects the whole batch before anything is stored."""
+        with self.assertRaises(ValueError):
+            self.asset_manager.put_assets_batch([
+                {"data": b"Valid blob"},
+                {"data": b"not a tensor", "kind": "tensor"},
+            ])
+        
+        self.assertEqual(self.asset_manager.list_assets(), [])
+
+    def test_put_assets_batch_rolls_back_on_failure(self):
+        """Test that a failed auto-commit batch does not leave its transaction open."""
+        manager = self.asset_manager.transaction_manager
+        with mock.patch.object(self.asset_manager.metadata_db, "add_assets_bulk",
+                               side_effect=RuntimeError("disk full")):
+            with self.assertRaises(RuntimeError):
+                self.asset_manager.put_assets_batch([{"data": b"Doomed 1"}, {"data": b"Doomed 2"}])
+        
+        self.assertEqual(manager._active_transactions, {})
+        self.assertEqual(manager._asset_transactions, {})
+
+    def test_delete_asset(self):
+        """Test deleting an asset."""
+        asset_id = self.asset_manager.put_asset(b"Asset to delete", kind="blob")
+        
+        self.assertTrue(self.asset_manager.delete_asset(asset_id))
+        self.assertIsNone(self.asset_manager.get_asset(asset_id))
+        self.assertFalse(self.asset_manager.delete_asset(asset_id))
+
+    def test_delete_asset_removes_embedding(self):
+        """Test that deleting an asset drops it from vector search."""
+        embedding = np.random.rand(128).astype(np.float32)
+        asset_id = self.asset_manager.put_asset(b"Embedded blob", kind="blob", embedding=embedding)
+        
+        self.assertTrue(self.asset_manager.delete_asset(asset_id))
+        
+        results = self.asset_manager.vector_db.search(embedding, k=1)
+        self.assertNotIn(asset_id, [hit for hit, _ in results])
+
     def test_snapshot_creation(self):
         """Test snapshot creation with Merkle tree and signatures."""
         # Create test assets
@@ -168,6 +377,35 @@ class TestAssetManager(unittest.TestCase):
         self.assertIn("merkle_tree", snapshot)
         self.assertIn("merkle_proofs", snapshot)
 
+    def test_snapshot_merkle_info_cached(self):
+        """Test that repeated get_snapshot calls reuse the Merkle proofs."""
+        asset_ids = [self.asset_manager.put_asset(f"Snapshot asset {i}".encode()) for i in range(3)]
+        snapshot_id = self.asset_manager.create_snapshot("test", asset_ids)
+        
+        first = self.asset_manager.get_snapshot(snapshot_id)
+        first["merkle_proofs"].clear()
+        second = self.asset_manager.get_snapshot(snapshot_id)
+        
+        self.assertEqual(set(second["merkle_proofs"]), set(asset_ids))
+        self.assertIn(snapshot_id, self.asset_manager._snapshot_merkle)
+        
+        # Adding an asset to the snapshot invalidates the cached entry
+        extra_id = self.asset_manager.put_asset(b"Late addition")
+        self.asset_manager.metadata_db.add_asset_to_snapshot(snapshot_id, extra_id)
+        self.assertIn(extra_id, self.asset_manager.get_snapshot(snapshot_id)["merkle_proofs"])
+
+    def test_snapshot_uses_stored_merkle_tree(self):
+        """Test that get_snapshot loads the stored tree instead of rebuilding it."""
+        asset_ids = [self.asset_manager.put_asset(f"Stored tree asset {i}".encode()) for i in range(3)]
+        snapshot_id = self.asset_manager.create_snapshot("test", asset_ids)
+        expected = self.asset_manager.get_snapshot(snapshot_id)["merkle_proofs"]
+        self.asset_manager._snapshot_merkle.clear()
+        
+        with mock.patch("aifs.asset.MerkleTree.__init__", side_effect=AssertionError("rebuilt")):
+            snapshot = self.asset_manager.get_snapshot(snapshot_id)
+        
+        self.assertEqual(snapshot["merkle_proofs"], expected)
+
     def test_snapshot_verification(self):
         """Test snapshot signature verification."""
         # Create test assets
@@ -270,6 +508,21 @@ class TestAssetManager(unittest.TestCase):
         self.assertIsNotNone(self.asset_manager.get_asset(embed_id))
         self.assertIsNotNone(self.asset_manager.get_asset(artifact_id))
 
+    def test_unknown_asset_kind_rejected(self):
+        """Test that assets of an unknown kind are rejected."""
+        self.assertTrue(self.asset_manager._validate_asset_kind("blob", b"data"))
+        self.assertFalse(self.asset_manager._validate_asset_kind("unknown", b"data"))
+        
+        with self.assertRaises(ValueError):
+            self.asset_manager.put_asset(data=b"data", kind="unknown")
+
+    def test_malformed_asset_data_rejected(self):
+        """Test that malformed data of each structured kind is rejected, not raised."""
+        for kind in ("tensor", "embed", "artifact"):
+            for data in (b"", b"\x00", b"\xff" * 64, memoryview(b"\x01\x00\x00\x00")):
+                with self.subTest(kind=kind, data=bytes(data)):
+                    self.assertFalse(self.asset_manager._validate_asset_kind(kind, data))
+
     def test_large_asset_handling(self):
         """Test handling of large assets."""
         # Create large test data
@@ -120,6 +120,17 @@ class TestURISchemes(unittest.TestCase):
         self.assertIsNone(AIFSUri.parse_asset_uri("aifs://invalid"))
         self.assertIsNone(AIFSUri.parse_snapshot_uri("aifs-snap://invalid"))
     
+    def test_uri_parsing_fallback_forms(self):
+        """Test that non-canonical spellings still parse as before."""
+        asset_id = "a" * 64
+        
+        self.assertEqual(AIFSUri.parse_asset_uri(f"AIFS://{asset_id}"), asset_id)
+        self.assertEqual(AIFSUri.parse_asset_uri(f"aifs://{asset_id}?x=1"), asset_id)
+        self.assertIsNone(AIFSUri.parse_asset_uri(f"aifs-snap://{asset_id}"))
+        self.assertIsNone(AIFSUri.parse_snapshot_uri(f"aifs://{asset_id}"))
+        self.assertIsNone(AIFSUri.parse_asset_uri(f"aifs://{asset_id}0"))
+        self.assertIsNone(AIFSUri.parse_asset_uri(None))
+    
     def test_uri_validation(self):
         """Test URI validation."""
         # Valid URIs
@@ -131,6 +142,19 @@ class TestURISchemes(unittest.TestCase):
         self.assertFalse(AIFSUri.validate_uri("aifs://invalid"))
         self.assertFalse(AIFSUri.validate_uri("aifs-snap://invalid"))
     
+    def test_is_valid_blake3_hash(self):
+        """Test hash validation accepts only 64 lowercase hex characters."""
+        self.assertTrue(AIFSUri.is_valid_blake3_hash("0123456789abcdef" * 4))
+        self.assertTrue(AIFSUri.is_valid_blake3_hash("1" * 64))
+        
+        self.assertFalse(AIFSUri.is_valid_blake3_hash("A" * 64))
+        self.assertFalse(AIFSUri.is_valid_blake3_hash("a" * 63))
+        self.assertFalse(AIFSUri.is_valid_blake3_hash("a" * 63 + "\n"))
+        self.assertFalse(AIFSUri.is_valid_blake3_hash("a" * 64 + "\n"))
+        self.assertFalse(AIFSUri.is_valid_blake3_hash("a" * 30 + "  " + "a" * 32))
+        self.assertFalse(AIFSUri.is_valid_blake3_hash("g" * 64))
+        self.assertFalse(AIFSUri.is_valid_blake3_hash(""))
+    
     def test_convenience_functions(self):
         """Test convenience functions."""
         asset_id = "a" * 64
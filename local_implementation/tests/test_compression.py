@@ -147,6 +147,28 @@ class TestCompressionService(unittest.TestCase):
         decompressed_data = service.decompress(compressed_data)
         self.assertEqual(decompressed_data, test_data)
 
+    def test_per_call_compression_level(self):
+        """Test overriding the compression level for a single call."""
+        test_data = b"Per-call level test data " * 200
+        
+        compressed = self.compression_service.compress(test_data, level=19)
+        
+        self.assertEqual(compressed, CompressionService(compression_level=19).compress(test_data))
+        self.assertEqual(self.compression_service.decompress(compressed), test_data)
+        with self.assertRaises(ValueError):
+            self.compression_service.compress(test_data, level=23)
+
+    def test_concurrent_compression(self):
+        """Test compressing and decompressing from several threads at once."""
+        from concurrent.futures import ThreadPoolExecutor
+        payloads = [os.urandom(1024) * 64 for _ in range(16)]
+        
+        def roundtrip(data):
+            return self.compression_service.decompress(self.compression_service.compress(data))
+        
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            self.assertEqual(list(pool.map(roundtrip, payloads)), payloads)
+
     def test_compression_stats(self):
         """Test compression statistics."""
         stats = self.compression_service.get_compression_stats()
@@ -29,6 +29,13 @@ class TestCryptoManager(unittest.TestCase):
         self.assertIsInstance(public_key_hex, str)
         self.assertEqual(len(public_key_hex), 64)  # 32 bytes = 64 hex chars
 
+    def test_public_key_matches_verify_key(self):
+        """Test that the cached public key forms match the verify key."""
+        public_key = bytes(self.crypto_manager.verify_key)
+        
+        self.assertEqual(self.crypto_manager.get_public_key(), public_key)
+        self.assertEqual(self.crypto_manager.get_public_key_hex(), public_key.hex())
+
     def test_snapshot_signing(self):
         """Test snapshot signing and verification."""
         merkle_root = "a" * 64
@@ -7,7 +7,7 @@ import os
 from pathlib import Path
 
 # Import AIFS components
-from aifs.merkle import MerkleTree, MerkleNode
+from aifs.merkle import MerkleTree, MerkleNode, MerkleNodeCache
 
 
 class TestMerkleTree(unittest.TestCase):
@@ -143,5 +143,62 @@ class TestMerkleTree(unittest.TestCase):
         self.assertTrue(tree.verify_proof(middle_asset, proof, tree.get_root_hash()))
 
 
+    def test_get_all_proofs(self):
+        """Test that get_all_proofs matches per-asset get_proof."""
+        for count in (1, 2, 5, 10):
+            asset_ids = [f"{i:064d}" for i in range(count)]
+            tree = MerkleTree(asset_ids)
+            
+            all_proofs = tree.get_all_proofs()
+            
+            self.assertEqual(set(all_proofs), set(asset_ids))
+            for asset_id in asset_ids:
+                self.assertEqual(all_proofs[asset_id], tree.get_proof(asset_id))
+        
+        self.assertEqual(MerkleTree([]).get_all_proofs(), {})
+
+    def test_node_cache_same_root(self):
+        """Test that a shared node cache does not change the root hash."""
+        cache = MerkleNodeCache()
+        cached_tree = MerkleTree(self.asset_ids, cache)
+        
+        self.assertEqual(cached_tree.get_root_hash(), MerkleTree(self.asset_ids).get_root_hash())
+        self.assertGreater(len(cache), 0)
+        
+        # Rebuilding an identical tree is served entirely from the cache
+        size = len(cache)
+        MerkleTree(self.asset_ids, cache)
+        self.assertEqual(len(cache), size)
+
+    def test_node_cache_eviction(self):
+        """Test that the node cache stays within its size bound."""
+        cache = MerkleNodeCache(max_size=2)
+        MerkleTree([f"{i:064d}" for i in range(10)], cache)
+        
+        self.assertEqual(len(cache), 2)
+
+    def test_serialize_roundtrip(self):
+        """Test that a deserialized tree matches the original."""
+        for count in (0, 1, 2, 5, 10):
+            asset_ids = [f"{i:064d}" for i in range(count)]
+            tree = MerkleTree(asset_ids)
+            
+            restored = MerkleTree.deserialize(tree.serialize())
+            
+            self.assertEqual(restored.asset_ids, tree.asset_ids)
+            self.assertEqual(restored.get_root_hash(), tree.get_root_hash())
+            self.assertEqual(restored.get_tree_structure(), tree.get_tree_structure())
+            self.assertEqual(restored.get_all_proofs(), tree.get_all_proofs())
+
+    def test_deserialize_malformed(self):
+        """Test that malformed serialized trees are rejected."""
+        data = MerkleTree(self.asset_ids).serialize()
+        
+        with self.assertRaises(ValueError):
+            MerkleTree.deserialize(b"not json")
+        with self.assertRaises(ValueError):
+            MerkleTree.deserialize(data.replace(b'"levels":[[', b'"levels":[["x",'))
+
+
 if __name__ == "__main__":
     unittest.main()
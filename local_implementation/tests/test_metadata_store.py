@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""Tests for the AIFS SQLite metadata store."""
+
+import unittest
+import tempfile
+import os
+import threading
+
+from aifs.metadata import MetadataStore, split_parents, _SQL_GET_CHILDREN, _SQL_GET_PARENTS
+
+
+class TestMetadataStoreConnections(unittest.TestCase):
+    """Test connection pooling in the metadata store."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "metadata.db")
+        self.metadata = MetadataStore(self.db_path)
+
+    def tearDown(self):
+        """Clean up test environment."""
+        self.metadata.close()
+        self.temp_dir.cleanup()
+
+    def test_connection_reused(self):
+        """Test that sequential operations reuse a pooled connection."""
+        with self.metadata._connection() as first:
+            pass
+        with self.metadata._connection() as second:
+            pass
+
+        self.assertIs(first, second)
+
+    def test_connection_pragmas(self):
+        """Test that pooled connections use WAL with relaxed fsync."""
+        with self.metadata._connection() as conn:
+            journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+            synchronous = conn.execute("PRAGMA synchronous").fetchone()[0]
+            busy_timeout = conn.execute("PRAGMA busy_timeout").fetchone()[0]
+
+        self.assertEqual(journal_mode, "wal")
+        self.assertEqual(synchronous, 1)  # NORMAL
+        self.assertEqual(busy_timeout, 5000)
+
+    def test_open_transaction_rolled_back_on_release(self):
+        """Test that a connection is returned to the pool without an open transaction."""
+        with self.metadata._connection(write=True) as conn:
+            conn.execute("BEGIN")
+            conn.execute(
+                "INSERT INTO assets (asset_id, kind, size) VALUES (?, ?, ?)",
+                ("uncommitted", "blob", 1)
+            )
+            self.assertTrue(conn.in_transaction)
+
+        self.assertFalse(conn.in_transaction)
+        self.assertIsNone(self.metadata.get_asset("uncommitted"))
+
+    def test_concurrent_writes(self):
+        """Test that writes from several threads all land."""
+        def writer(worker):
+            for i in range(20):
+                self.metadata.add_asset(f"asset-{worker}-{i}", "blob", i)
+
+        threads = [threading.Thread(target=writer, args=(w,)) for w in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assets = self.metadata.list_assets(limit=1000)
+        self.assertEqual(len(assets), 80)
+
+    def test_lineage_lookups_use_covering_indexes(self):
+        """Test that parent/child lookups are served by covering indexes without a sort."""
+        with self.metadata._connection() as conn:
+            for sql, index in ((_SQL_GET_PARENTS, "idx_lineage_child_cov"),
+                               (_SQL_GET_CHILDREN, "idx_lineage_parent_cov")):
+                plan = " ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, ("x",)))
+                self.assertIn(f"COVERING INDEX {index}", plan)
+                self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_analyze_only_when_lineage_indexes_change(self):
+        """Test that reopening a store skips ANALYZE unless the lineage indexes were replaced."""
+        self.metadata.add_asset("asset-1", "blob", 1)
+        self.metadata.close()
+
+        def stat_rows():
+            with store._connection() as conn:
+                return conn.execute("SELECT COUNT(*) FROM sqlite_stat1").fetchone()[0]
+
+        store = MetadataStore(self.db_path)
+        self.assertEqual(stat_rows(), 0)
+        with store._connection() as conn:
+            conn.execute("CREATE INDEX idx_lineage_parent_id ON lineage (parent_id)")
+            conn.commit()
+        store.close()
+
+        store = MetadataStore(self.db_path)
+        self.assertGreater(stat_rows(), 0)
+        store.close()
+
+    def test_close(self):
+        """Test that close drains the pool and the store stays usable."""
+        self.metadata.add_asset("asset-1", "blob", 1)
+        self.metadata.close()
+
+        self.assertTrue(self.metadata._pool.empty())
+        self.assertEqual(self.metadata.get_asset("asset-1")["size"], 1)
+
+
+class TestMetadataStoreBulk(unittest.TestCase):
+    """Test bulk insert methods of the metadata store."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "metadata.db")
+        self.metadata = MetadataStore(self.db_path)
+
+    def tearDown(self):
+        """Clean up test environment."""
+        self.metadata.close()
+        self.temp_dir.cleanup()
+
+    def test_add_assets_bulk(self):
+        """Test adding many assets at once."""
+        self.metadata.add_assets_bulk([
+            ("asset-1", "blob", 10, {"name": "one"}),
+            ("asset-2", "blob", 20, None),
+        ])
+
+        self.assertEqual(self.metadata.get_asset("asset-1")["metadata"], {"name": "one"})
+        self.assertEqual(self.metadata.get_asset("asset-2")["size"], 20)
+
+    def test_add_lineage_bulk(self):
+        """Test adding many lineage edges at once."""
+        self.metadata.add_assets_bulk([
+            ("parent-1", "blob", 1, None),
+            ("parent-2", "blob", 2, None),
+            ("child", "blob", 3, None),
+        ])
+        self.metadata.add_lineage_bulk([
+            ("child", "parent-1", "merge", "sha256:abc"),
+            ("child", "parent-2", "merge", None),
+        ])
+
+        parents = self.metadata.get_parents("child")
+        self.assertEqual({p["asset_id"] for p in parents}, {"parent-1", "parent-2"})
+        self.assertEqual(len(self.metadata.get_children("parent-1")), 1)
+
+    def test_add_lineage_batch(self):
+        """Test adding lineage from split parent columns."""
+        self.metadata.add_assets_bulk([(name, "blob", 1, None) for name in ("parent-1", "parent-2", "child")])
+        parent_ids, transform_names, transform_digests = split_parents([
+            {"asset_id": "parent-1", "transform_name": "merge", "transform_digest": "sha256:abc"},
+            {"asset_id": "parent-2"},
+        ])
+
+        self.assertEqual(parent_ids, ("parent-1", "parent-2"))
+        self.assertEqual(transform_names, ("merge", None))
+        self.assertEqual(split_parents(None), ((), (), ()))
+
+        self.metadata.add_lineage_batch("child", parent_ids, transform_names, transform_digests)
+
+        parents = {p["asset_id"]: p for p in self.metadata.get_parents("child")}
+        self.assertEqual(set(parents), {"parent-1", "parent-2"})
+        self.assertEqual(parents["parent-1"]["transform_digest"], "sha256:abc")
+        self.assertIsNone(parents["parent-2"]["transform_name"])
+
+    def test_add_assets_to_snapshot_bulk(self):
+        """Test adding many assets to a snapshot at once."""
+        self.metadata.add_assets_bulk([(f"asset-{i}", "blob", i, None) for i in range(5)])
+        snapshot_id = self.metadata.create_snapshot("test", "root", auto_sign=False)
+
+        self.metadata.add_assets_to_snapshot_bulk(snapshot_id, [f"asset-{i}" for i in range(5)])
+        # Re-adding is ignored
+        self.metadata.add_assets_to_snapshot_bulk(snapshot_id, ["asset-0"])
+
+        snapshot = self.metadata.get_snapshot(snapshot_id)
+        self.assertEqual(len(snapshot["assets"]), 5)
+
+    def test_snapshot_merkle_tree(self):
+        """Test storing a serialized Merkle tree with a snapshot."""
+        snapshot_id = self.metadata.create_snapshot("test", "root", auto_sign=False, merkle_tree=b"tree")
+        other_id = self.metadata.create_snapshot("test", "other", auto_sign=False)
+
+        self.assertEqual(self.metadata.get_snapshot_merkle_tree(snapshot_id), b"tree")
+        self.assertIsNone(self.metadata.get_snapshot_merkle_tree(other_id))
+        self.assertIsNone(self.metadata.get_snapshot_merkle_tree("missing"))
+
+    def test_create_snapshot_with_assets(self):
+        """Test creating a snapshot together with its assets."""
+        self.metadata.add_assets_bulk([(f"asset-{i}", "blob", i, None) for i in range(3)])
+
+        snapshot_id = self.metadata.create_snapshot("test", "root", auto_sign=False,
+                                                    asset_ids=["asset-0", "asset-2"])
+
+        snapshot = self.metadata.get_snapshot(snapshot_id)
+        self.assertEqual({a["asset_id"] for a in snapshot["assets"]}, {"asset-0", "asset-2"})
+
+    def test_iter_snapshot_assets(self):
+        """Test streaming the assets of a snapshot."""
+        self.metadata.add_assets_bulk([(f"asset-{i}", "blob", i, None) for i in range(3)])
+        snapshot_id = self.metadata.create_snapshot("test", "root", auto_sign=False)
+        self.metadata.add_assets_to_snapshot_bulk(snapshot_id, [f"asset-{i}" for i in range(3)])
+
+        assets = list(self.metadata.iter_snapshot_assets(snapshot_id))
+
+        self.assertEqual({a["asset_id"] for a in assets}, {"asset-0", "asset-1", "asset-2"})
+        self.assertEqual(assets, self.metadata.get_snapshot(snapshot_id)["assets"])
+
+    def test_get_assets_bulk(self):
+        """Test looking up many assets at once."""
+        self.metadata.add_assets_bulk([(f"asset-{i}", "blob", i, None) for i in range(3)])
+
+        assets = self.metadata.get_assets_bulk(["asset-0", "asset-2", "missing", "asset-0"])
+
+        self.assertEqual(set(assets), {"asset-0", "asset-2"})
+        self.assertEqual(assets["asset-2"]["size"], 2)
+
+    def test_get_lineage_bulk(self):
+        """Test looking up parents and children of many assets at once."""
+        self.metadata.add_assets_bulk([(f"asset-{i}", "blob", i, None) for i in range(3)])
+        self.metadata.add_lineage_bulk([
+            ("asset-1", "asset-0", "derive", None),
+            ("asset-2", "asset-0", None, None),
+            ("asset-2", "asset-1", None, None),
+        ])
+        
+        parents = self.metadata.get_parents_bulk(["asset-0", "asset-2", "missing"])
+        children = self.metadata.get_children_bulk(["asset-0", "asset-2"])
+        
+        self.assertEqual(parents["asset-0"], [])
+        self.assertEqual(parents["missing"], [])
+        self.assertEqual(parents["asset-2"], self.metadata.get_parents("asset-2"))
+        self.assertEqual(children["asset-0"], self.metadata.get_children("asset-0"))
+        self.assertEqual(children["asset-2"], [])
+
+    def test_asset_exists_and_count_children(self):
+        """Test the cheap existence and child-count probes."""
+        self.metadata.add_assets_bulk([("parent", "blob", 1, None), ("child", "blob", 1, None)])
+        self.metadata.add_lineage("child", "parent")
+
+        self.assertTrue(self.metadata.asset_exists("parent"))
+        self.assertFalse(self.metadata.asset_exists("missing"))
+        self.assertEqual(self.metadata.count_children("parent"), 1)
+        self.assertEqual(self.metadata.count_children("child"), 0)
+
+        self.metadata.add_asset("parent", "deleted", 0, {"deleted": True})
+        self.assertFalse(self.metadata.asset_exists("parent"))
+
+    def test_empty_bulk_calls(self):
+        """Test that empty bulk calls are no-ops."""
+        self.metadata.add_assets_bulk([])
+        self.metadata.add_lineage_bulk([])
+        self.metadata.add_assets_to_snapshot_bulk("missing", [])
+
+        self.assertEqual(self.metadata.list_assets(), [])
+
+    def test_metadata_round_trip(self):
+        """Test that JSON metadata round-trips with non-string values."""
+        metadata = {"flag": True, "missing": None, "tags": ["a", "b"], "score": 0.5}
+        self.metadata.add_asset("asset-1", "blob", 1, metadata)
+
+        self.assertEqual(self.metadata.get_asset("asset-1")["metadata"], metadata)
+
+    def test_metadata_round_trip_special_numbers(self):
+        """Test that numpy scalars, big ints and non-finite floats round-trip."""
+        import math
+        import numpy as np
+
+        metadata = {
+            "float64": np.float64(1.5),
+            "int64": np.int64(3),
+            "big": 2 ** 70,
+            "inf": float("inf"),
+            "missing": None,
+        }
+        self.metadata.add_asset("asset-1", "blob", 1, metadata)
+        self.metadata.add_asset("asset-2", "blob", 1, {"nan": float("nan")})
+
+        stored = self.metadata.get_asset("asset-1")["metadata"]
+        self.assertEqual(stored, {"float64": 1.5, "int64": 3, "big": 2 ** 70, "inf": float("inf"), "missing": None})
+        self.assertTrue(math.isnan(self.metadata.get_asset("asset-2")["metadata"]["nan"]))
+
+    def test_metadata_encoding_independent_of_content(self):
+        """Test that datetimes and UUIDs save alongside nulls and are stored as TEXT."""
+        import datetime
+        import uuid
+
+        moment = datetime.datetime(2024, 1, 2, 3, 4, 5, 678901)
+        identifier = uuid.uuid4()
+        self.metadata.add_asset("asset-1", "blob", 1, {"t": moment, "x": None})
+        self.metadata.add_asset("asset-2", "blob", 1, {"u": identifier, "s": "nullable", "n": float("nan")})
+
+        self.assertEqual(self.metadata.get_asset("asset-1")["metadata"], {"t": moment.isoformat(), "x": None})
+        self.assertEqual(self.metadata.get_asset("asset-2")["metadata"]["u"], str(identifier))
+        with self.metadata._connection() as conn:
+            types = {row[0] for row in conn.execute("SELECT typeof(metadata) FROM assets")}
+        self.assertEqual(types, {"text"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,11 +3,15 @@
 
 import unittest
 import tempfile
+import io
 import os
 from pathlib import Path
+from unittest import mock
+
+import blake3
 
 # Import AIFS components
-from aifs.storage import StorageBackend
+from aifs.storage import StorageBackend, PARALLEL_HASH_THRESHOLD
 
 
 class TestStorageBackend(unittest.TestCase):
@@ -151,6 +155,101 @@ class TestStorageBackend(unittest.TestCase):
         retrieved_data = self.storage.get(asset_id)
         self.assertEqual(retrieved_data, large_data)
 
+    def test_parallel_hash_matches_serial(self):
+        """Test that payloads above the threshold hash to the plain BLAKE3 digest."""
+        data = os.urandom(PARALLEL_HASH_THRESHOLD + 1)
+        
+        asset_id = self.storage.put(data)
+        
+        self.assertEqual(asset_id, blake3.blake3(data).hexdigest())
+        self.assertEqual(self.storage.get(asset_id), data)
+        
+        # Explicit thread counts, including single-threaded, give the same digest
+        for threads in (1, 2):
+            storage = StorageBackend(Path(self.temp_dir.name) / f"storage-{threads}", hash_threads=threads)
+            self.assertEqual(storage.put(data), asset_id)
+
+    def test_put_many(self):
+        """Test storing several payloads at once."""
+        items = [b"first", b"second", b"first"]
+        
+        hashes = self.storage.put_many(items)
+        
+        self.assertEqual(hashes, [blake3.blake3(item).hexdigest() for item in items])
+        for hash_hex, item in zip(hashes, items):
+            self.assertEqual(self.storage.get(hash_hex), item)
+        self.assertEqual(self.storage.put_many([]), [])
+
+    def test_put_many_concurrent_duplicates(self):
+        """Test that duplicate payloads in a batch are written once and read back intact."""
+        items = [os.urandom(4096) for _ in range(8)]
+        items += items
+        
+        hashes = self.storage.put_many(items, max_workers=4)
+        
+        self.assertEqual(len(set(hashes)), 8)
+        for hash_hex, item in zip(hashes, items):
+            self.assertEqual(self.storage.get(hash_hex), item)
+        self.assertEqual(list(self.storage.chunks_dir.rglob("*.tmp")), [])
+
+    def test_put_existing_skips_write(self):
+        """Test that storing known content only hashes it."""
+        data = b"Duplicate content"
+        hash_hex = self.storage.put(data)
+        self.assertEqual(self.storage.hash(data), hash_hex)
+        
+        with mock.patch.object(self.storage.compression_service, "compress") as compress:
+            self.assertEqual(self.storage.put(data), hash_hex)
+            self.assertEqual(self.storage.put_many([data, data]), [hash_hex, hash_hex])
+        compress.assert_not_called()
+
+    def test_get_many(self):
+        """Test retrieving several payloads at once."""
+        hashes = self.storage.put_many([b"first", b"second"])
+        
+        found = self.storage.get_many(hashes + ["0" * 64, hashes[0]])
+        
+        self.assertEqual(found, {hashes[0]: b"first", hashes[1]: b"second"})
+        self.assertEqual(self.storage.get_many([]), {})
+
+    def test_put_file(self):
+        """Test storing from a path and a file object matches put()."""
+        data = os.urandom(1 << 16)
+        source = Path(self.temp_dir.name) / "source.bin"
+        source.write_bytes(data)
+        
+        asset_id, size = self.storage.put_file(source)
+        self.assertEqual(asset_id, blake3.blake3(data).hexdigest())
+        self.assertEqual(size, len(data))
+        self.assertEqual(self.storage.get(asset_id), data)
+        
+        with open(source, "rb") as f:
+            self.assertEqual(self.storage.put_file(f), (asset_id, len(data)))
+        
+        empty = Path(self.temp_dir.name) / "empty.bin"
+        empty.write_bytes(b"")
+        self.assertEqual(self.storage.put_file(empty), (self.storage.put(b""), 0))
+
+    def test_put_file_stream(self):
+        """Test storing new content from a stream hashes it while spooling."""
+        data = os.urandom(3 * (1 << 20) + 5)
+        
+        asset_id, size = self.storage.put_file(io.BytesIO(data))
+        
+        self.assertEqual((asset_id, size), (blake3.blake3(data).hexdigest(), len(data)))
+        self.assertEqual(self.storage.get(asset_id), data)
+        self.assertEqual(self.storage.put_file(io.BytesIO(b"")), (self.storage.hash(b""), 0))
+        
+        # The spool files are removed
+        self.assertEqual([p for p in Path(self.storage.root_dir).iterdir() if p.is_file()], [])
+
+    def test_put_file_stream_failure_removes_spool(self):
+        """Test that a failed read does not leave the spool file behind."""
+        with self.assertRaises(TypeError):
+            self.storage.put_file(io.StringIO("text, not bytes"))
+        
+        self.assertEqual([p for p in Path(self.storage.root_dir).iterdir() if p.is_file()], [])
+
     def test_empty_data_storage(self):
         """Test storage of empty data."""
         empty_data = b""
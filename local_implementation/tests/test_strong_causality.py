@@ -11,6 +11,7 @@ import tempfile
 import time
 import threading
 from pathlib import Path
+from unittest import mock
 
 # Import AIFS modules
 from aifs.asset import AssetManager
@@ -60,6 +61,25 @@ class TestTransactionManager(unittest.TestCase):
         success = self.transaction_manager.add_dependency(transaction_id, parent_asset_id)
         self.assertTrue(success)
     
+    def test_add_dependencies(self):
+        """Test adding several dependencies to a transaction at once."""
+        parent_ids = []
+        for _ in range(2):
+            parent_transaction = self.transaction_manager.begin_transaction()
+            parent_ids.append(f"parent_{parent_transaction}")
+            self.transaction_manager.add_asset_to_transaction(parent_transaction, parent_ids[-1])
+        
+        transaction_id = self.transaction_manager.begin_transaction()
+        success = self.transaction_manager.add_dependencies(transaction_id, parent_ids)
+        
+        self.assertTrue(success)
+        self.assertFalse(self.transaction_manager.check_dependencies_committed(transaction_id))
+        
+        for parent_id in parent_ids:
+            parent_transaction = self.transaction_manager.get_asset_transaction(parent_id)
+            self.transaction_manager.commit_transaction(parent_transaction)
+        self.assertTrue(self.transaction_manager.check_dependencies_committed(transaction_id))
+    
     def test_commit_transaction(self):
         """Test committing a transaction."""
         transaction_id = self.transaction_manager.begin_transaction()
@@ -78,6 +98,51 @@ class TestTransactionManager(unittest.TestCase):
         # Check transaction state
         self.assertEqual(self.transaction_manager.get_transaction_state(transaction_id), TransactionState.COMMITTED)
     
+    def test_concurrent_commits_are_combined(self):
+        """Test that commits queued while another is being written share one SQLite commit."""
+        transaction_ids = []
+        for i in range(5):
+            transaction_id = self.transaction_manager.begin_transaction()
+            self.transaction_manager.add_asset_to_transaction(transaction_id, f"asset_{i}")
+            transaction_ids.append(transaction_id)
+        
+        flushes = []
+        flush = self.transaction_manager._flush_commits
+        self.transaction_manager._flush_commits = lambda: (flushes.append(1), flush())
+        results = {}
+        
+        def commit(transaction_id):
+            results[transaction_id] = self.transaction_manager.commit_transaction(transaction_id)
+        
+        # Hold the commit lock so every committer queues behind it
+        with self.transaction_manager._commit_lock:
+            threads = [threading.Thread(target=commit, args=(tid,)) for tid in transaction_ids]
+            for thread in threads:
+                thread.start()
+            while self.transaction_manager._commit_queue.qsize() < len(transaction_ids):
+                time.sleep(0.01)
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(len(flushes), 1)
+        self.assertTrue(all(results[tid] for tid in transaction_ids))
+        for i, transaction_id in enumerate(transaction_ids):
+            self.assertTrue(self.transaction_manager.is_asset_visible(f"asset_{i}"))
+            self.assertEqual(self.transaction_manager.get_transaction_state(transaction_id),
+                             TransactionState.COMMITTED)
+    
+    def test_commit_failure_resolves_waiters(self):
+        """Test that a commit whose database write fails reports failure instead of hanging."""
+        transaction_id = self.transaction_manager.begin_transaction()
+        self.transaction_manager.add_asset_to_transaction(transaction_id, "asset_fail")
+        
+        with mock.patch("aifs.transaction.sqlite3.connect", side_effect=RuntimeError("disk gone")):
+            self.assertFalse(self.transaction_manager.commit_transaction(transaction_id))
+        
+        self.assertTrue(self.transaction_manager._commit_queue.empty())
+        self.assertEqual(self.transaction_manager.get_transaction_state(transaction_id), TransactionState.FAILED)
+        self.assertFalse(self.transaction_manager.is_asset_visible("asset_fail"))
+    
     def test_rollback_transaction(self):
         """Test rolling back a transaction."""
         transaction_id = self.transaction_manager.begin_transaction()
@@ -121,6 +186,37 @@ class TestTransactionManager(unittest.TestCase):
         success = self.transaction_manager.commit_transaction(transaction_id)
         self.assertTrue(success)
     
+    def test_visibility_cache(self):
+        """Test that committed assets are answered from the visibility cache."""
+        transaction_id = self.transaction_manager.begin_transaction()
+        self.transaction_manager.add_assets_to_transaction(transaction_id, ["cached_asset"])
+        self.transaction_manager.commit_transaction(transaction_id)
+        
+        with mock.patch("aifs.transaction.sqlite3.connect", side_effect=AssertionError("queried")):
+            self.assertTrue(self.transaction_manager.is_asset_visible("cached_asset"))
+            self.assertEqual(self.transaction_manager.get_visible_assets_subset(["cached_asset"]),
+                             {"cached_asset"})
+        
+        # Many unknown IDs are checked in several IN queries
+        ids = [f"unknown_{i}" for i in range(1200)] + ["cached_asset"]
+        self.transaction_manager._visible_cache.clear()
+        self.assertEqual(self.transaction_manager.get_visible_assets_subset(ids), {"cached_asset"})
+    
+    def test_get_commit_diagnostics(self):
+        """Test the diagnostics reported for a transaction that cannot commit."""
+        transaction_id = self.transaction_manager.begin_transaction()
+        self.transaction_manager.add_asset_to_transaction(transaction_id, "child_asset")
+        self.transaction_manager.add_dependencies(transaction_id, ["child_asset", "missing_parent"])
+        
+        self.assertEqual(self.transaction_manager.get_commit_diagnostics(transaction_id), {
+            "state": TransactionState.PENDING,
+            "dependencies_committed": False,
+        })
+        self.assertEqual(self.transaction_manager.get_commit_diagnostics("missing"), {
+            "state": None,
+            "dependencies_committed": False,
+        })
+    
     def test_transaction_context_manager(self):
         """Test transaction context manager."""
         asset_id = "test_asset_123"
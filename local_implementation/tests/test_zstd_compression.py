@@ -329,6 +329,29 @@ class TestAssetManagerCompression(unittest.TestCase):
                 import shutil
                 shutil.rmtree(temp_dir)
     
+    def test_compression_policy_per_kind(self):
+        """Test that each asset kind is compressed at its configured level."""
+        asset_manager = AssetManager(os.path.join(self.temp_dir, "policy"), enable_strong_causality=False,
+                                     compression_policy={"blob": 9})
+        compress = asset_manager.storage.compression_service.compress
+        levels = []
+        
+        def record(data, level=None):
+            levels.append(level)
+            return compress(data, level)
+        
+        with patch.object(asset_manager.storage.compression_service, "compress", side_effect=record):
+            blob_id = asset_manager.put_asset(b"Policy blob", "blob")
+            asset_manager.put_assets_batch([{"data": b"Batch blob"}])
+            asset_manager.put_embedding(EmbeddingData(vector=np.ones(4, dtype=np.float32),
+                                                      model="custom", dimension=4))
+        
+        self.assertEqual(levels, [9, 9, None])
+        self.assertEqual(asset_manager.get_asset(blob_id)["data"], b"Policy blob")
+        
+        with self.assertRaises(ValueError):
+            AssetManager(os.path.join(self.temp_dir, "invalid"), compression_policy={"blob": 0})
+    
     def test_compression_service_access(self):
         """Test that AssetManager provides access to compression service."""
         # Test compression service is available